@@ -0,0 +1,165 @@
+"""Priority admission control so gate scans never queue behind dashboards.
+
+Check-in and scan endpoints are always admitted. Expensive read endpoints
+(stats, analytics, presence, roster, QR sheets, exports) share a small pool
+of concurrency slots, which shrinks to ``BUSY_LIMIT`` while the gate is busy
+(a scan arrived within the last ``GATE_BUSY_WINDOW`` seconds). A request
+that is not admitted gets the last good response for the same URL if it is
+recent enough, or ``503 Retry-After``. The stale copies live in a small LRU
+cache; large bodies (QR sheets, exports) are not kept.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from flask import g, request
+
+ENABLED = os.environ.get('ADMISSION_CONTROL', '1') != '0'
+LOW_PRIORITY_LIMIT = int(os.environ.get('LOW_PRIORITY_LIMIT', 2))
+# Low-priority slots while the gate is busy
+BUSY_LIMIT = int(os.environ.get('BUSY_LIMIT', 1))
+STALE_MAX_AGE = int(os.environ.get('STALE_MAX_AGE', 60))
+STALE_CACHE_ENTRIES = int(os.environ.get('STALE_CACHE_ENTRIES', 64))
+STALE_CACHE_MAX_BYTES = int(os.environ.get('STALE_CACHE_MAX_BYTES', 1_000_000))
+GATE_BUSY_WINDOW = float(os.environ.get('GATE_BUSY_WINDOW', 0.5))
+# With BUSY_LIMIT=0, still let one low-priority request through this often
+MAX_STARVATION = float(os.environ.get('MAX_STARVATION', 15))
+RETRY_AFTER = 2
+
+HIGH_PRIORITY_ENDPOINTS = {
+    'scan', 'scan_local', 'get_team_by_token', 'team_action', 'member_action', 'sync_actions',
+    'get_member_by_token', 'member_checkin'
+}
+LOW_PRIORITY_ENDPOINTS = {
+    'get_stats', 'get_arrivals', 'get_presence_at', 'get_presence_timeline',
+    'get_roster', 'generate_qrs', 'export_data'
+}
+
+class AdmissionController:
+    """Bounded admission for low-priority requests with a stale-response fallback"""
+
+    def __init__(self, limit=LOW_PRIORITY_LIMIT, stale_max_age=STALE_MAX_AGE):
+        self.limit = limit
+        self.stale_max_age = stale_max_age
+        self.enabled = ENABLED
+        self._in_use = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_high = float('-inf')
+        self._last_admitted = float('-inf')
+        self.stats = {'admitted': 0, 'stale': 0, 'rejected': 0}
+
+    def mark_high_priority(self):
+        self._last_high = time.monotonic()
+
+    def gate_busy(self):
+        return time.monotonic() - self._last_high < GATE_BUSY_WINDOW
+
+    def try_acquire(self):
+        now = time.monotonic()
+        with self._lock:
+            limit = self.limit
+            if self.gate_busy():
+                # A busy gate shrinks the pool instead of closing it
+                limit = min(limit, BUSY_LIMIT)
+                if limit == 0 and now - self._last_admitted >= MAX_STARVATION:
+                    limit = 1
+            if self._in_use >= limit:
+                return False
+            self._in_use += 1
+            self._last_admitted = now
+            return True
+
+    def release(self):
+        with self._lock:
+            self._in_use -= 1
+
+    def remember(self, key, response):
+        """Keep a copy of a good low-priority response for overload fallback"""
+        body = response.get_data()
+        if len(body) > STALE_CACHE_MAX_BYTES:
+            return
+        now = time.monotonic()
+        with self._lock:
+            # Drop expired copies, then the least recently used past the cap
+            for old_key, entry in list(self._cache.items()):
+                if now - entry[0] > self.stale_max_age:
+                    del self._cache[old_key]
+            self._cache[key] = (now, response.status_code, response.mimetype, body)
+            self._cache.move_to_end(key)
+            while len(self._cache) > STALE_CACHE_ENTRIES:
+                self._cache.popitem(last=False)
+
+    def cached(self, key):
+        """Return (age, status, mimetype, body) if a fresh enough copy exists"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[0]
+        if age > self.stale_max_age:
+            return None
+        return (age,) + entry[1:]
+
+    def count(self, outcome):
+        with self._lock:
+            self.stats[outcome] += 1
+
+controller = AdmissionController()
+
+def _cache_key():
+    return request.full_path
+
+def init_app(app):
+    """Register admission hooks; call after other after_request hooks are set up"""
+
+    @app.before_request
+    def admit_request():
+        if not controller.enabled:
+            return None
+        if request.endpoint in HIGH_PRIORITY_ENDPOINTS:
+            controller.mark_high_priority()
+            return None
+        if request.endpoint not in LOW_PRIORITY_ENDPOINTS:
+            return None
+
+        if controller.try_acquire():
+            g.admission_slot = True
+            controller.count('admitted')
+            return None
+
+        # Overloaded: serve the last good response if it is recent enough
+        g.admission_shed = True
+        cached = controller.cached(_cache_key())
+        if cached and request.method == 'GET':
+            age, status, mimetype, body = cached
+            controller.count('stale')
+            response = app.response_class(body, status=status, mimetype=mimetype)
+            response.headers['Age'] = str(int(age))
+            response.headers['X-Cache'] = 'stale'
+            response.headers['Retry-After'] = str(RETRY_AFTER)
+            return response
+
+        controller.count('rejected')
+        response = app.response_class(
+            '{"error":"Server busy, retry shortly"}', status=503, mimetype='application/json'
+        )
+        response.headers['Retry-After'] = str(RETRY_AFTER)
+        return response
+
+    @app.after_request
+    def remember_response(response):
+        # Runs before compression, so the cached body is the plain one
+        if getattr(g, 'admission_slot', False) and not getattr(g, 'admission_shed', False) \
+                and request.method == 'GET' and response.status_code == 200 \
+                and not response.is_streamed:
+            controller.remember(_cache_key(), response)
+        return response
+
+    @app.teardown_request
+    def release_slot(exc):
+        if g.pop('admission_slot', False):
+            controller.release()
@@ -0,0 +1,235 @@
+"""Arrival analytics maintained incrementally from the attendance logs.
+
+Aggregates are kept in small summary tables and caught up from the last
+processed log id, so reading them never touches the raw log tables beyond
+the rows that arrived since the previous catch-up.
+"""
+import time
+from datetime import datetime, timezone
+
+BUCKET_MINUTES = 5
+BUCKET_SECONDS = BUCKET_MINUTES * 60
+# Log ids folded per write transaction, so catch-up never blocks gate writes for long
+CATCH_UP_CHUNK = 500
+# Pause between chunks; SQLite's busy handler polls, so waiting writers need a gap
+CATCH_UP_PAUSE = 0.02
+
+def init_tables(conn):
+    """Create analytics summary tables if they don't exist"""
+    # Check-ins per time bucket, per college and kind ('team' or 'member')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS arrival_buckets (
+            bucket INTEGER NOT NULL,
+            college TEXT NOT NULL,
+            kind TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (bucket, college, kind)
+        )
+    ''')
+
+    # First team check-in and the moment every member had arrived
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS team_arrivals (
+            team_id TEXT PRIMARY KEY,
+            team_in_at INTEGER,
+            all_in_at INTEGER,
+            members_in INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Members that have checked in at least once
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS member_arrivals (
+            member_id INTEGER PRIMARY KEY,
+            first_in_at INTEGER NOT NULL
+        )
+    ''')
+
+    # Single-row catch-up cursor and running totals
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_team_log_id INTEGER NOT NULL DEFAULT 0,
+            last_member_log_id INTEGER NOT NULL DEFAULT 0,
+            full_arrival_seconds INTEGER NOT NULL DEFAULT 0,
+            full_arrival_teams INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO analytics_state (id) VALUES (1)')
+
+    # Member counts per team are looked up for every member check-in
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_members_team ON members (team_id)')
+
+def parse_log_time(value):
+    """Convert a log timestamp (SQLite CURRENT_TIMESTAMP, UTC) to epoch seconds"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    dt = datetime.fromisoformat(str(value).replace('T', ' ').rstrip('Z'))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp())
+
+def format_time(epoch):
+    """Format epoch seconds the same way SQLite stores log timestamps"""
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+def _bump_bucket(conn, at, college, kind):
+    bucket = at - at % BUCKET_SECONDS
+    conn.execute('''
+        INSERT INTO arrival_buckets (bucket, college, kind, count) VALUES (?, ?, ?, 1)
+        ON CONFLICT (bucket, college, kind) DO UPDATE SET count = count + 1
+    ''', (bucket, college, kind))
+
+def _complete_team(conn, team_id):
+    """Record team-in to all-members-in time once both are known"""
+    arrival = conn.execute(
+        'SELECT * FROM team_arrivals WHERE team_id = ?', (team_id,)
+    ).fetchone()
+    if not arrival or arrival['team_in_at'] is None or arrival['all_in_at'] is None:
+        return
+
+    # Members may all be in before the team itself is marked in
+    seconds = max(arrival['all_in_at'] - arrival['team_in_at'], 0)
+    conn.execute('''
+        UPDATE analytics_state
+        SET full_arrival_seconds = full_arrival_seconds + ?,
+            full_arrival_teams = full_arrival_teams + 1
+        WHERE id = 1
+    ''', (seconds,))
+
+def _apply_team_in(conn, row):
+    at = parse_log_time(row['at'])
+    _bump_bucket(conn, at, row['college'], 'team')
+
+    conn.execute(
+        'INSERT OR IGNORE INTO team_arrivals (team_id) VALUES (?)', (row['team_id'],)
+    )
+    updated = conn.execute(
+        'UPDATE team_arrivals SET team_in_at = ? WHERE team_id = ? AND team_in_at IS NULL',
+        (at, row['team_id'])
+    ).rowcount
+    if updated:
+        _complete_team(conn, row['team_id'])
+
+def _apply_member_in(conn, row):
+    at = parse_log_time(row['at'])
+    _bump_bucket(conn, at, row['college'], 'member')
+
+    first_in = conn.execute(
+        'INSERT OR IGNORE INTO member_arrivals (member_id, first_in_at) VALUES (?, ?)',
+        (row['member_id'], at)
+    ).rowcount
+    if not first_in:
+        return
+
+    conn.execute(
+        'INSERT OR IGNORE INTO team_arrivals (team_id) VALUES (?)', (row['team_id'],)
+    )
+    conn.execute(
+        'UPDATE team_arrivals SET members_in = members_in + 1 WHERE team_id = ?',
+        (row['team_id'],)
+    )
+
+    member_count = conn.execute(
+        'SELECT COUNT(*) as count FROM members WHERE team_id = ?', (row['team_id'],)
+    ).fetchone()['count']
+    completed = conn.execute('''
+        UPDATE team_arrivals SET all_in_at = ?
+        WHERE team_id = ? AND all_in_at IS NULL AND members_in >= ?
+    ''', (at, row['team_id'], member_count)).rowcount
+    if completed:
+        _complete_team(conn, row['team_id'])
+
+def catch_up(conn):
+    """Fold log rows added since the last catch-up into the aggregates"""
+    init_tables(conn)
+    conn.commit()
+
+    # Fix the upper bound first so rows written during catch-up wait for the next one
+    last_team_id = conn.execute(
+        'SELECT COALESCE(MAX(id), 0) as id FROM team_attendance_log'
+    ).fetchone()['id']
+    last_member_id = conn.execute(
+        'SELECT COALESCE(MAX(id), 0) as id FROM member_attendance_log'
+    ).fetchone()['id']
+
+    team_query = '''
+        SELECT l.id, l.team_id, l.at, t.college
+        FROM team_attendance_log l
+        JOIN teams t ON t.team_id = l.team_id
+        WHERE l.id > ? AND l.id <= ? AND l.action = 'in'
+        ORDER BY l.id
+    '''
+    member_query = '''
+        SELECT l.id, l.member_id, l.at, m.team_id, t.college
+        FROM member_attendance_log l
+        JOIN members m ON m.id = l.member_id
+        JOIN teams t ON t.team_id = m.team_id
+        WHERE l.id > ? AND l.id <= ? AND l.action = 'in'
+        ORDER BY l.id
+    '''
+
+    processed = 0
+    for column, query, last_id, apply in (
+        ('last_team_log_id', team_query, last_team_id, _apply_team_in),
+        ('last_member_log_id', member_query, last_member_id, _apply_member_in),
+    ):
+        while True:
+            # Take the write lock before reading the cursor, so two concurrent
+            # catch-ups never fold the same chunk twice
+            conn.execute('BEGIN IMMEDIATE')
+            done = conn.execute(
+                f'SELECT {column} FROM analytics_state WHERE id = 1'
+            ).fetchone()[0]
+            if done >= last_id:
+                conn.commit()
+                break
+            chunk_end = min(done + CATCH_UP_CHUNK, last_id)
+            rows = conn.execute(query, (done, chunk_end)).fetchall()
+            for row in rows:
+                apply(conn, row)
+            conn.execute(
+                f'UPDATE analytics_state SET {column} = ? WHERE id = 1', (chunk_end,)
+            )
+            conn.commit()
+            processed += len(rows)
+            if chunk_end < last_id:
+                time.sleep(CATCH_UP_PAUSE)
+
+    return processed
+
+def arrivals(conn, college=None):
+    """Return the arrival curve, per-college curves and team completion time"""
+    query = 'SELECT bucket, college, kind, count FROM arrival_buckets'
+    params = ()
+    if college:
+        query += ' WHERE college = ?'
+        params = (college,)
+    rows = conn.execute(query + ' ORDER BY bucket', params).fetchall()
+
+    overall = {}
+    by_college = {}
+    for row in rows:
+        start = format_time(row['bucket'])
+        total = overall.setdefault(row['bucket'], {'start': start, 'teams': 0, 'members': 0})
+        per_college = by_college.setdefault(row['college'], {}).setdefault(
+            row['bucket'], {'start': start, 'teams': 0, 'members': 0}
+        )
+        key = 'teams' if row['kind'] == 'team' else 'members'
+        total[key] += row['count']
+        per_college[key] += row['count']
+
+    state = conn.execute('SELECT * FROM analytics_state WHERE id = 1').fetchone()
+    completed = state['full_arrival_teams']
+
+    return {
+        'bucket_minutes': BUCKET_MINUTES,
+        'buckets': list(overall.values()),
+        'by_college': {
+            name: list(buckets.values()) for name, buckets in sorted(by_college.items())
+        },
+        'team_to_all_members': {
+            'teams': completed,
+            'avg_seconds': round(state['full_arrival_seconds'] / completed, 1) if completed else None
+        }
+    }
@@ -1,30 +1,56 @@
-from flask import Flask, render_template, request, jsonify, redirect, url_for, flash
+from flask import Flask, render_template, request, jsonify, redirect, url_for, flash, send_from_directory, Response, stream_with_context
 import sqlite3
 import os
+import time
 from datetime import datetime
 import secrets
 import segno
 from io import StringIO, BytesIO
 import csv
+from markupsafe import escape
+import admission
+import analytics
+import assets
+import badges
+import export
+import presence
+import replica
+import sync
 
 app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')
 
+# Compressed responses, content-hashed static URLs and compact JSON
+assets.init_app(app)
+
+# Dashboards and exports are shed under load so gate scans stay fast
+admission.init_app(app)
+
 # Configuration
 DATABASE = 'hackathon.db'
 ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', 'admin123')
 BASE_URL = os.environ.get('BASE_URL', 'http://localhost:5000')
 
+# Optional read replica (READ_REPLICA=1) for heavy read-only endpoints
+read_replica = replica.ReadReplica(lambda: DATABASE)
+
 def get_db():
     """Get database connection"""
     conn = sqlite3.connect(DATABASE)
     conn.row_factory = sqlite3.Row
     return conn
 
+def get_read_db():
+    """Get connection for read-only queries, using the replica when fresh enough"""
+    return read_replica.connect() or get_db()
+
 def init_db():
     """Initialize database with tables"""
     conn = get_db()
     
+    # WAL lets long reads (exports, stats) run alongside check-in writes
+    conn.execute('PRAGMA journal_mode=WAL')
+    
     # Teams table
     conn.execute('''
         CREATE TABLE IF NOT EXISTS teams (
@@ -51,10 +77,14 @@ def init_db():
             phone TEXT,
             gender TEXT,
             is_present INTEGER DEFAULT 0,
+            token TEXT,
             FOREIGN KEY (team_id) REFERENCES teams (team_id)
         )
     ''')
     
+    # Per-member badge tokens (added to older databases, backfilled)
+    badges.init_tables(conn)
+    
     # Team attendance log
     conn.execute('''
         CREATE TABLE IF NOT EXISTS team_attendance_log (
@@ -79,6 +109,15 @@ def init_db():
         )
     ''')
     
+    # Arrival analytics summary tables
+    analytics.init_tables(conn)
+    
+    # Offline scanner sync bookkeeping
+    sync.init_tables(conn)
+    
+    # Presence interval index
+    presence.init_tables(conn)
+    
     conn.commit()
     conn.close()
 
@@ -124,6 +163,18 @@ def scan():
     
     return render_template('scan.html', team=dict(team), members=[dict(m) for m in members])
 
+@app.route('/scan/local')
+def scan_local():
+    """Scan page shell rendered in the browser from the cached roster"""
+    return render_template('scan.html', local=True)
+
+@app.route('/sw.js')
+def service_worker():
+    """Serve the service worker from the root so it controls every page"""
+    response = send_from_directory(app.static_folder, 'sw.js', max_age=0)
+    response.headers['Service-Worker-Allowed'] = '/'
+    return response
+
 @app.route('/dashboard')
 def dashboard():
     """Dashboard page"""
@@ -233,10 +284,80 @@ def member_action():
     
     return jsonify({'success': True, 'action': action})
 
+@app.route('/api/member/by-token')
+def get_member_by_token():
+    """Get member info by badge token"""
+    token = request.args.get('token')
+    if not token:
+        return jsonify({'error': 'Token required'}), 400
+    
+    conn = get_db()
+    member = badges.find_member(conn, token)
+    conn.close()
+    
+    if not member:
+        return jsonify({'error': 'Member not found'}), 404
+    
+    return jsonify({'member': dict(member)})
+
+@app.route('/api/member/checkin', methods=['POST'])
+def member_checkin():
+    """Check a member in (or out) straight from their badge scan"""
+    data = request.get_json(silent=True) or {}
+    token = data.get('token')
+    action = data.get('action', 'in')
+    by_who = data.get('by_who', 'scanner')
+    
+    if not token:
+        return jsonify({'error': 'Token required'}), 400
+    if action not in ('in', 'out'):
+        return jsonify({'error': "action must be 'in' or 'out'"}), 400
+    
+    conn = get_db()
+    result = badges.check_in(conn, token, action, by_who)
+    conn.close()
+    
+    if not result:
+        return jsonify({'error': 'Member not found'}), 404
+    
+    return jsonify({'success': True, **result})
+
+@app.route('/api/roster')
+def get_roster():
+    """Get one page of the roster for the scanner's offline cache"""
+    try:
+        after = int(request.args.get('after', 0))
+        limit = min(int(request.args.get('limit', sync.ROSTER_PAGE)), sync.ROSTER_PAGE)
+    except ValueError:
+        return jsonify({'error': 'after and limit must be integers'}), 400
+    
+    conn = get_read_db()
+    page = sync.roster_page(conn, after=after, limit=limit)
+    conn.close()
+    
+    return jsonify(page)
+
+@app.route('/api/sync', methods=['POST'])
+def sync_actions():
+    """Replay an ordered batch of actions queued by an offline scanner"""
+    data = request.get_json(silent=True) or {}
+    actions = data.get('actions')
+    
+    if not isinstance(actions, list):
+        return jsonify({'error': 'actions list required'}), 400
+    if len(actions) > sync.MAX_BATCH:
+        return jsonify({'error': f'At most {sync.MAX_BATCH} actions per batch'}), 413
+    
+    conn = get_db()
+    results = sync.apply_batch(conn, actions, sent_at=data.get('sent_at'))
+    conn.close()
+    
+    return jsonify({'success': True, 'results': results})
+
 @app.route('/api/stats')
 def get_stats():
     """Get attendance statistics"""
-    conn = get_db()
+    conn = get_read_db()
     
     # Team stats
     team_total = conn.execute('SELECT COUNT(*) as count FROM teams').fetchone()['count']
@@ -286,6 +407,70 @@ def get_stats():
         'team_list': team_list
     })
 
+@app.route('/api/analytics/arrivals')
+def get_arrivals():
+    """Get check-in curves per 5 minutes, per college and team completion time"""
+    conn = get_db()
+    
+    # Fold in only the log rows written since the last request
+    analytics.catch_up(conn)
+    result = analytics.arrivals(conn, college=request.args.get('college'))
+    
+    conn.close()
+    
+    return jsonify(result)
+
+@app.route('/api/presence/at')
+def get_presence_at():
+    """Get how many teams and members were on site at time t (UTC)"""
+    try:
+        at = presence.parse_time(request.args.get('t', str(int(time.time()))))
+    except ValueError:
+        return jsonify({'error': 't must be epoch seconds or YYYY-MM-DD HH:MM[:SS]'}), 400
+    
+    conn = get_db()
+    presence.catch_up(conn)
+    result = {
+        'at': analytics.format_time(at),
+        'teams': presence.headcount_at(conn, 'team', at),
+        'members': presence.headcount_at(conn, 'member', at)
+    }
+    conn.close()
+    
+    return jsonify(result)
+
+@app.route('/api/presence/timeline')
+def get_presence_timeline():
+    """Get hourly headcounts between from and to (UTC, default: last 24 hours)"""
+    now = int(time.time())
+    try:
+        end = presence.parse_time(request.args.get('to', str(now)))
+        start = presence.parse_time(request.args.get('from', str(end - 24 * 3600)))
+    except ValueError:
+        return jsonify({'error': 'from/to must be epoch seconds or YYYY-MM-DD HH:MM[:SS]'}), 400
+    
+    if start > end:
+        return jsonify({'error': 'from must be before to'}), 400
+    if (end - start) // 3600 > presence.MAX_TIMELINE_HOURS:
+        return jsonify({'error': f'At most {presence.MAX_TIMELINE_HOURS} hours per request'}), 400
+    
+    conn = get_db()
+    presence.catch_up(conn)
+    result = {
+        'from': analytics.format_time(start),
+        'to': analytics.format_time(end),
+        'teams': presence.timeline(conn, 'team', start, end),
+        'members': presence.timeline(conn, 'member', start, end)
+    }
+    conn.close()
+    
+    return jsonify(result)
+
+@app.route('/api/replica')
+def get_replica_status():
+    """Get read replica lag and refresh metrics"""
+    return jsonify(read_replica.metrics())
+
 @app.route('/admin/import-csv', methods=['GET', 'POST'])
 def import_csv():
     """Import teams and members from CSV"""
@@ -347,12 +532,13 @@ def import_csv():
             # Insert member (always insert, even if team exists)
             if row['member_name'].strip():
                 conn.execute('''
-                    INSERT INTO members (team_id, name, phone)
-                    VALUES (?, ?, ?)
+                    INSERT INTO members (team_id, name, phone, token)
+                    VALUES (?, ?, ?, ?)
                 ''', (
                     team_id,
                     row['member_name'].strip(),
-                    row['member_phone'].strip()
+                    row['member_phone'].strip(),
+                    badges.new_token()
                 ))
                 members_imported += 1
         
@@ -368,14 +554,46 @@ def import_csv():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/export')
+def export_data():
+    """Stream teams, members, presence or log history as CSV or JSON Lines"""
+    if not require_admin_token():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    kind = request.args.get('kind', 'presence')
+    fmt = request.args.get('format', 'csv')
+    error = export.validate(kind, fmt)
+    if error:
+        return jsonify({'error': error}), 400
+    
+    def generate():
+        conn = get_read_db()
+        try:
+            yield from export.iter_export(conn, kind, fmt)
+        finally:
+            conn.close()
+    
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+    response = Response(stream_with_context(generate()), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={kind}.{fmt}'
+    return response
+
 @app.route('/admin/generate-qrs')
 def generate_qrs():
-    """Generate QR codes for all teams"""
+    """Generate QR codes for all teams, plus member badges with ?badges=1"""
     if not require_admin_token():
         return jsonify({'error': 'Unauthorized'}), 401
     
+    with_badges = request.args.get('badges') == '1'
+    
     conn = get_db()
     teams = conn.execute('SELECT team_id, name, token FROM teams').fetchall()
+    members_by_team = {}
+    if with_badges:
+        for member in conn.execute(
+            'SELECT team_id, name, token FROM members WHERE token IS NOT NULL ORDER BY id'
+        ):
+            members_by_team.setdefault(member['team_id'], []).append(member)
     conn.close()
     
     qr_codes = []
@@ -395,7 +613,11 @@ def generate_qrs():
             'team_name': team['name'],
             'token': token,
             'url': token,  # Just show the token instead of full URL
-            'svg': svg_content
+            'svg': svg_content,
+            'badges': [
+                {'name': m['name'], 'token': m['token'], 'svg': badges.badge_svg(m['token'])}
+                for m in members_by_team.get(team['team_id'], [])
+            ]
         })
     
     # Return HTML page with all QR codes
@@ -414,6 +636,14 @@ def generate_qrs():
                 background-color: white;
             }
             .qr-item h3 { margin-top: 0; }
+            .badge-grid { display: flex; flex-wrap: wrap; gap: 10px; margin-top: 10px; }
+            .badge-item {
+                border: 1px dashed #999;
+                padding: 8px;
+                text-align: center;
+                page-break-inside: avoid;
+            }
+            .badge-item strong, .badge-item small { display: block; }
             .export-btn {
                 position: fixed;
                 top: 20px;
@@ -451,14 +681,26 @@ def generate_qrs():
         <h1>Team QR Codes</h1>
     '''
     
+    # Team and member names come from the public registration sheet
     for qr in qr_codes:
         html += f'''
         <div class="qr-item">
-            <h3>{qr['team_id']} - {qr['team_name']}</h3>
+            <h3>{escape(qr['team_id'])} - {escape(qr['team_name'])}</h3>
             <p><strong>Team Token:</strong> {qr['url']}</p>
             {qr['svg']}
-        </div>
         '''
+        if qr['badges']:
+            html += '<div class="badge-grid">'
+            for badge in qr['badges']:
+                html += f'''
+                <div class="badge-item">
+                    <strong>{escape(badge['name'])}</strong>
+                    {badge['svg']}
+                    <small>{badge['token']}</small>
+                </div>
+                '''
+            html += '</div>'
+        html += '</div>'
     
     html += '</body></html>'
     return html
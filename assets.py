@@ -0,0 +1,172 @@
+"""Compressed delivery and content-hashed URLs for static assets.
+
+Templates link assets through ``static_url()``, which appends a content hash
+so the files can be cached as immutable. Responses are compressed with
+brotli (when the optional ``brotli`` package is installed) or gzip, using the
+pre-compressed ``.br``/``.gz`` variants written by ``manage.py build-assets``
+when they are up to date.
+"""
+import gzip
+import hashlib
+import os
+
+from flask import request, url_for
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MIN_COMPRESS_SIZE = 500
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/json', 'application/javascript', 'image/svg+xml'
+)
+PRECOMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.json')
+
+# (path, mtime) -> content hash, and (path, mtime, encoding) -> compressed bytes
+_hashes = {}
+_compressed = {}
+
+def file_hash(path):
+    """Short content hash of a file, cached until the file changes"""
+    key = (path, os.path.getmtime(path))
+    if key not in _hashes:
+        with open(path, 'rb') as f:
+            _hashes[key] = hashlib.sha256(f.read()).hexdigest()[:12]
+    return _hashes[key]
+
+def compress(data, encoding):
+    """Compress bytes with the given content encoding"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9)
+
+def choose_encoding(accept_encoding):
+    """Pick the best encoding the client accepts"""
+    accepted = {
+        part.split(';')[0].strip() for part in accept_encoding.lower().split(',')
+    }
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+def _is_compressible(response):
+    return response.mimetype and response.mimetype.startswith(COMPRESSIBLE_TYPES)
+
+def _static_body(path, encoding):
+    """Compressed bytes for a static file, from disk variant or memory cache"""
+    suffix = '.br' if encoding == 'br' else '.gz'
+    variant = path + suffix
+    mtime = os.path.getmtime(path)
+    if os.path.exists(variant) and os.path.getmtime(variant) >= mtime:
+        with open(variant, 'rb') as f:
+            return f.read()
+
+    key = (path, mtime, encoding)
+    if key not in _compressed:
+        with open(path, 'rb') as f:
+            _compressed[key] = compress(f.read(), encoding)
+    return _compressed[key]
+
+def _static_response(app, response):
+    filename = (request.view_args or {}).get('filename')
+    if not filename:
+        return response
+    path = safe_join(app.static_folder, filename)
+    if path is None or not os.path.isfile(path):
+        return response
+
+    # Hashed URLs never change content, so browsers may keep them forever
+    if request.args.get('v') == file_hash(path):
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        response.cache_control.no_cache = None
+        response.expires = None
+
+    if response.status_code != 200 or not _is_compressible(response) \
+            or os.path.getsize(path) < MIN_COMPRESS_SIZE:
+        return response
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    response.vary.add('Accept-Encoding')
+    if encoding is None:
+        return response
+
+    body = _static_body(path, encoding)
+    response.direct_passthrough = False
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    etag, _ = response.get_etag()
+    if etag:
+        # Each encoding is a distinct representation; revalidate against its own tag
+        response.set_etag(f'{etag}-{encoding}')
+        response.make_conditional(request)
+    return response
+
+def _dynamic_response(response):
+    if response.status_code != 200 or response.is_streamed or response.direct_passthrough \
+            or 'Content-Encoding' in response.headers or not _is_compressible(response):
+        return response
+
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+
+    response.vary.add('Accept-Encoding')
+    encoding = choose_encoding(request.headers.get('Accept-Encoding', ''))
+    if encoding is None:
+        return response
+
+    # Fast settings for per-request bodies; static files get the slow, small ones
+    if encoding == 'br':
+        body = brotli.compress(data, quality=4)
+    else:
+        body = gzip.compress(data, compresslevel=6)
+    response.set_data(body)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+def init_app(app):
+    """Register hashed static URLs, compression and compact JSON on the app"""
+    app.json.compact = True
+
+    @app.context_processor
+    def inject_static_url():
+        def static_url(filename):
+            path = os.path.join(app.static_folder, filename)
+            return url_for('static', filename=filename, v=file_hash(path))
+        return {'static_url': static_url}
+
+    @app.after_request
+    def compress_response(response):
+        if request.endpoint == 'static':
+            return _static_response(app, response)
+        return _dynamic_response(response)
+
+def build(static_folder):
+    """Write .gz (and .br) variants next to each static file; return size report"""
+    report = []
+    for root, _, files in os.walk(static_folder):
+        for name in sorted(files):
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            sizes = {'original': len(data)}
+            encodings = ['gzip'] + (['br'] if brotli is not None else [])
+            for encoding in encodings:
+                body = compress(data, encoding)
+                suffix = '.br' if encoding == 'br' else '.gz'
+                with open(path + suffix, 'wb') as f:
+                    f.write(body)
+                sizes[encoding] = len(body)
+
+            report.append((os.path.relpath(path, static_folder), sizes))
+    return report
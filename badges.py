@@ -0,0 +1,102 @@
+"""Per-member QR badges and one-scan member check-in.
+
+Every member gets their own token (``m_`` prefix, so scanners can tell it
+apart from a team token) looked up through a unique index. Scanning a
+badge checks that member in with a single request instead of opening the
+team page and clicking their row.
+"""
+import secrets
+from io import BytesIO
+
+import segno
+
+TOKEN_PREFIX = 'm_'
+
+def new_token():
+    """Random member badge token, short enough for a small QR code"""
+    return TOKEN_PREFIX + secrets.token_urlsafe(9)
+
+def init_tables(conn):
+    """Add members.token to older databases and give every member a token"""
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(members)')]
+    if 'token' not in columns:
+        conn.execute('ALTER TABLE members ADD COLUMN token TEXT')
+    conn.execute(
+        'CREATE UNIQUE INDEX IF NOT EXISTS idx_members_token ON members (token)'
+    )
+    backfill_tokens(conn)
+
+def backfill_tokens(conn):
+    """Generate tokens for members imported without one; return how many"""
+    missing = conn.execute('SELECT id FROM members WHERE token IS NULL').fetchall()
+    conn.executemany(
+        'UPDATE members SET token = ? WHERE id = ?',
+        [(new_token(), row[0]) for row in missing]
+    )
+    return len(missing)
+
+def find_member(conn, token):
+    """Member row with its team's name and token, or None"""
+    return conn.execute('''
+        SELECT m.id, m.team_id, m.name, m.token, m.is_present,
+               t.name as team_name, t.token as team_token, t.is_present as team_present
+        FROM members m
+        JOIN teams t ON t.team_id = m.team_id
+        WHERE m.token = ?
+    ''', (token,)).fetchone()
+
+def check_in(conn, token, action='in', by_who='scanner'):
+    """Mark a member in/out by badge token; return the result dict or None.
+
+    Repeated scans in the same direction are reported, not logged again.
+    Checking in a member also checks in their team if it isn't yet.
+    """
+    member = find_member(conn, token)
+    if not member:
+        return None
+
+    is_present = 1 if action == 'in' else 0
+    changed = member['is_present'] != is_present
+    if changed:
+        conn.execute(
+            'UPDATE members SET is_present = ? WHERE id = ?', (is_present, member['id'])
+        )
+        conn.execute(
+            'INSERT INTO member_attendance_log (member_id, action, by_who) VALUES (?, ?, ?)',
+            (member['id'], action, by_who)
+        )
+
+    team_checked_in = action == 'in' and not member['team_present']
+    if team_checked_in:
+        conn.execute(
+            'UPDATE teams SET is_present = 1 WHERE team_id = ?', (member['team_id'],)
+        )
+        conn.execute(
+            'INSERT INTO team_attendance_log (team_id, action, by_who) VALUES (?, ?, ?)',
+            (member['team_id'], 'in', by_who)
+        )
+    conn.commit()
+
+    return {
+        'member': {
+            'id': member['id'],
+            'name': member['name'],
+            'team_id': member['team_id'],
+            'team_name': member['team_name'],
+            'team_token': member['team_token'],
+            'is_present': is_present
+        },
+        'action': action,
+        'changed': changed,
+        'team_checked_in': team_checked_in
+    }
+
+def make_qr(token):
+    """QR code for a badge token, same settings as the team codes"""
+    return segno.make(token, error='M', version=4)
+
+def badge_svg(token):
+    """Inline SVG markup for a badge token"""
+    svg_io = BytesIO()
+    make_qr(token).save(svg_io, kind='svg', scale=4, border=2, dark="black", light="white")
+    return svg_io.getvalue().decode('utf-8')
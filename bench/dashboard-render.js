@@ -0,0 +1,229 @@
+// Browser-free render benchmark for the dashboard team list.
+//
+// Runs static/dashboard.js against a minimal fake DOM that counts every
+// mutation (elements created, nodes inserted/removed, property writes) and
+// checks that a refresh costs DOM work in proportion to the number of teams
+// that changed, not the number of teams.
+//
+//   node bench/dashboard-render.js [teams...]      (default: 1000 10000 50000)
+const path = require('path');
+const { TeamListView } = require(path.join(__dirname, '..', 'static', 'dashboard.js'));
+
+const VIEWPORT_HEIGHT = 800;
+const CHANGES = 10;
+
+let ops = 0;
+
+class FakeNode {
+    constructor(tag) {
+        this.tagName = tag;
+        this.children = [];
+        this.parent = null;
+        this._text = '';
+        this._className = '';
+        const counted = () => new Proxy({}, {
+            set(target, key, value) {
+                if (target[key] !== value) ops++;
+                target[key] = value;
+                return true;
+            }
+        });
+        this.style = counted();
+        this.dataset = counted();
+        this.classList = { add: () => { ops++; } };
+    }
+
+    set textContent(value) {
+        ops++;
+        this._text = value;
+        if (value === '') this.children = [];
+    }
+
+    get textContent() {
+        return this._text;
+    }
+
+    set className(value) {
+        ops++;
+        this._className = value;
+    }
+
+    get className() {
+        return this._className;
+    }
+
+    appendChild(child) {
+        return this.insertBefore(child, null);
+    }
+
+    insertBefore(child, before) {
+        ops++;
+        if (child.parent) child.parent.children.splice(child.parent.children.indexOf(child), 1);
+        const index = before ? this.children.indexOf(before) : -1;
+        if (index === -1) this.children.push(child);
+        else this.children.splice(index, 0, child);
+        child.parent = this;
+        return child;
+    }
+
+    remove() {
+        if (!this.parent) return;
+        ops++;
+        this.parent.children.splice(this.parent.children.indexOf(this), 1);
+        this.parent = null;
+    }
+}
+
+const fakeDocument = {
+    createElement(tag) {
+        ops++;
+        return new FakeNode(tag);
+    },
+    createTextNode(text) {
+        ops++;
+        const node = new FakeNode('#text');
+        node._text = text;
+        return node;
+    }
+};
+
+function makeTeams(count) {
+    const teams = [];
+    for (let i = 0; i < count; i++) {
+        teams.push({
+            team_id: `T${String(i).padStart(5, '0')}`,
+            name: `Team ${String(i).padStart(5, '0')}`,
+            college: `College ${i % 40}`,
+            is_present: i % 3 === 0 ? 1 : 0,
+            member_count: 4,
+            members_present: i % 3 === 0 ? 2 : 0
+        });
+    }
+    return teams;
+}
+
+// What /api/stats returns on the next refresh: fresh objects every time
+function refreshPayload(teams, changedIndexes) {
+    const changed = new Set(changedIndexes);
+    return teams.map((team, i) => {
+        const copy = { ...team };
+        if (changed.has(i)) {
+            copy.is_present = team.is_present ? 0 : 1;
+            copy.members_present = copy.is_present ? 4 : 0;
+        }
+        return copy;
+    });
+}
+
+// The previous dashboard rebuilt every row as one HTML string per refresh
+function legacyRender(teams) {
+    return teams.map(team => `
+        <div class="team-row ${team.is_present === 1 ? 'team-present' : 'team-absent'}" onclick="showTeamDetails('${team.team_id}')">
+            <div class="team-main-info">
+                <h3>${team.name}</h3>
+                <p class="team-id">ID: ${team.team_id}</p>
+                <p class="team-college">${team.college}</p>
+            </div>
+            <div class="team-stats">
+                <div class="member-count">
+                    <span class="present">${team.members_present || 0}</span> /
+                    <span class="total">${team.member_count}</span> members present
+                </div>
+                <span class="team-status ${team.is_present === 1 ? 'status-present' : 'status-absent'}">
+                    ${team.is_present === 1 ? '✅ Team Present' : '❌ Team Absent'}
+                </span>
+            </div>
+        </div>
+    `).join('');
+}
+
+function measure(fn) {
+    const before = ops;
+    const started = process.hrtime.bigint();
+    fn();
+    const ms = Number(process.hrtime.bigint() - started) / 1e6;
+    return { ops: ops - before, ms };
+}
+
+function run(count) {
+    const container = new FakeNode('div');
+    container.scrollTop = 0;
+    container.clientHeight = VIEWPORT_HEIGHT;
+    const view = new TeamListView(container, { document: fakeDocument, rowHeight: 140 });
+
+    let teams = makeTeams(count);
+    const results = {};
+    results.initial = measure(() => view.update(teams));
+    const mounted = view.rows.size;
+
+    teams = refreshPayload(teams, []);
+    results.unchanged = measure(() => view.update(teams));
+
+    // Changes inside the visible window (the first rows)
+    const visible = Array.from({ length: CHANGES }, (_, i) => i);
+    teams = refreshPayload(teams, visible);
+    results.visible = measure(() => view.update(teams));
+
+    // Changes far below the window: nothing on screen to patch
+    const offscreen = Array.from({ length: CHANGES }, (_, i) => count - 1 - i * 7);
+    teams = refreshPayload(teams, offscreen);
+    results.offscreen = measure(() => view.update(teams));
+
+    results.filter = measure(() => view.setFilter('present'));
+    view.setFilter('all');
+
+    container.scrollTop = Math.floor(count / 2) * view.rowHeight;
+    results.scroll = measure(() => view.renderNow());
+
+    results.legacy = measure(() => legacyRender(teams));
+
+    return { count, mounted, results };
+}
+
+const counts = process.argv.slice(2).map(Number).filter(Boolean);
+const runs = (counts.length ? counts : [1000, 10000, 50000]).map(run);
+
+console.log(`Viewport ${VIEWPORT_HEIGHT}px, ${CHANGES} changed teams per refresh`);
+console.log('DOM operations (and JS time) per update:\n');
+const header = ['teams', 'rows in DOM', 'initial', 'no change', `${CHANGES} visible`,
+    `${CHANGES} off-screen`, 'filter', 'scroll', 'legacy rows'];
+console.log(header.map(h => h.padStart(15)).join(''));
+for (const { count, mounted, results } of runs) {
+    const cell = r => `${r.ops} (${r.ms.toFixed(1)}ms)`.padStart(15);
+    console.log([
+        String(count).padStart(15),
+        String(mounted).padStart(15),
+        cell(results.initial),
+        cell(results.unchanged),
+        cell(results.visible),
+        cell(results.offscreen),
+        cell(results.filter),
+        cell(results.scroll),
+        `${count} (${results.legacy.ms.toFixed(1)}ms)`.padStart(15)
+    ].join(''));
+}
+
+// Work per refresh must not grow with the number of teams
+let failed = false;
+for (const key of ['initial', 'unchanged', 'visible', 'offscreen', 'filter']) {
+    const values = new Set(runs.map(r => r.results[key].ops));
+    if (values.size > 1) {
+        console.log(`\nFAIL: ${key} DOM work depends on team count: ${[...values].join(', ')}`);
+        failed = true;
+    }
+}
+// Scrolling refills the window; which fields differ varies a little with position
+for (const { count, results } of runs) {
+    if (results.scroll.ops > results.initial.ops) {
+        console.log(`\nFAIL: scrolling ${count} teams did more work than the first render`);
+        failed = true;
+    }
+}
+if (runs[0].results.unchanged.ops !== 0 || runs[0].results.offscreen.ops !== 0) {
+    console.log('\nFAIL: a refresh without visible changes touched the DOM');
+    failed = true;
+}
+if (!failed) {
+    console.log('\nOK: DOM work per refresh is independent of the number of teams');
+}
+process.exit(failed ? 1 : 0);
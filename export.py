@@ -0,0 +1,93 @@
+"""Streaming export of teams, members, presence and attendance history.
+
+Rows are pulled from SQLite in fixed-size batches with ``fetchmany`` and
+written out batch by batch, so memory use stays flat no matter how large
+the tables are and the first bytes go out before the query finishes.
+"""
+import csv
+import json
+from io import StringIO
+
+FETCH_SIZE = 1000
+FORMATS = ('csv', 'jsonl')
+
+QUERIES = {
+    'teams': 'SELECT * FROM teams ORDER BY id',
+    'members': 'SELECT * FROM members ORDER BY id',
+    'presence': '''
+        SELECT t.team_id, t.name as team_name, t.college, t.is_present as team_present,
+               m.id as member_id, m.name as member_name, m.is_present as member_present
+        FROM teams t
+        LEFT JOIN members m ON m.team_id = t.team_id
+        ORDER BY t.id, m.id
+    ''',
+    'team_log': '''
+        SELECT id, team_id, action, by_who, at
+        FROM team_attendance_log ORDER BY id
+    ''',
+    'member_log': '''
+        SELECT l.id, l.member_id, m.team_id, m.name as member_name, l.action, l.by_who, l.at
+        FROM member_attendance_log l
+        LEFT JOIN members m ON m.id = l.member_id
+        ORDER BY l.id
+    '''
+}
+KINDS = tuple(QUERIES)
+
+def iter_batches(conn, kind):
+    """Yield (columns, rows) batches for one export kind"""
+    cursor = conn.cursor()
+    cursor.row_factory = None
+    cursor.execute(QUERIES[kind])
+    columns = [col[0] for col in cursor.description]
+
+    try:
+        rows = cursor.fetchmany(FETCH_SIZE)
+        # An empty table still yields one batch so CSV output gets its header
+        yield columns, rows
+        while rows:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if rows:
+                yield columns, rows
+    finally:
+        cursor.close()
+
+def iter_csv(conn, kind):
+    """Yield CSV text for one kind, one chunk per fetched batch"""
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    header_written = False
+
+    for columns, rows in iter_batches(conn, kind):
+        if not header_written:
+            writer.writerow(columns)
+            header_written = True
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def iter_jsonl(conn, kinds):
+    """Yield JSON Lines for the given kinds, tagging each line with its kind"""
+    for kind in kinds:
+        for columns, rows in iter_batches(conn, kind):
+            yield ''.join(
+                json.dumps({'type': kind, **dict(zip(columns, row))}, separators=(',', ':')) + '\n'
+                for row in rows
+            )
+
+def iter_export(conn, kind, fmt):
+    """Yield export chunks; 'all' is only available as JSON Lines"""
+    if fmt == 'csv':
+        return iter_csv(conn, kind)
+    return iter_jsonl(conn, KINDS if kind == 'all' else (kind,))
+
+def validate(kind, fmt):
+    """Return an error message for an unsupported kind/format, or None"""
+    if fmt not in FORMATS:
+        return f"Unknown format '{fmt}' (expected one of: {', '.join(FORMATS)})"
+    if kind == 'all' and fmt == 'jsonl':
+        return None
+    if kind not in KINDS:
+        return f"Unknown export '{kind}' (expected one of: {', '.join(KINDS)}, or all with jsonl)"
+    return None
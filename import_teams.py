@@ -3,6 +3,11 @@ import csv
 import secrets
 import os
 import re
+import sys
+import json
+import hashlib
+
+import badges
 
 def extract_team_size(size_str):
     """
@@ -29,6 +34,11 @@ def extract_team_size(size_str):
 
 # Configuration
 DATABASE = 'hackathon.db'
+CSV_FILE = 'kurukshetra.csv'
+
+# Sheet columns (the export pads some headers with spaces)
+TEAM_FIELDS = ('name', 'college', 'team_size', 'leader_name', 'leader_email', 'leader_phone')
+MEMBER_FIELDS = ('phone', 'gender')
 
 def get_db():
     """Get database connection"""
@@ -66,10 +76,14 @@ def init_db():
             phone TEXT,
             gender TEXT,
             is_present INTEGER DEFAULT 0,
+            token TEXT,
             FOREIGN KEY (team_id) REFERENCES teams (team_id)
         )
     ''')
     
+    # Per-member badge tokens (added to older databases, backfilled)
+    badges.init_tables(conn)
+    
     # Team attendance log
     conn.execute('''
         CREATE TABLE IF NOT EXISTS team_attendance_log (
@@ -94,6 +108,16 @@ def init_db():
         )
     ''')
     
+    # Content hash of each imported sheet row, used by sync_teams()
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS import_hashes (
+            entity TEXT NOT NULL,
+            key TEXT NOT NULL,
+            hash TEXT NOT NULL,
+            PRIMARY KEY (entity, key)
+        )
+    ''')
+    
     conn.commit()
     conn.close()
 
@@ -172,13 +196,14 @@ def import_teams():
                     try:
                         conn.execute('''
                             INSERT INTO members (
-                                team_id, name, phone, gender
-                            ) VALUES (?, ?, ?, ?)
+                                team_id, name, phone, gender, token
+                            ) VALUES (?, ?, ?, ?, ?)
                         ''', (
                             current_team_id,
                             row['            Team Members'].strip(),
                             row['      Phone no.'].strip() if row['      Phone no.'] else None,
-                            row['        Gender'].strip() if row['        Gender'] else None
+                            row['        Gender'].strip() if row['        Gender'] else None,
+                            badges.new_token()
                         ))
                         conn.commit()
                         members_imported += 1
@@ -189,11 +214,226 @@ def import_teams():
         conn.commit()
         print(f"Imported {teams_imported} teams and {members_imported} members")
 
+def clean(value):
+    """Strip a CSV cell, treating missing cells as empty"""
+    return value.strip() if value else ''
+
+def row_hash(values):
+    """Content hash of one team or member row"""
+    return hashlib.sha1(json.dumps(list(values)).encode('utf-8')).hexdigest()
+
+def member_key(team_id, name):
+    return f"{team_id}\x1f{name}"
+
+def parse_sheet(csv_file=CSV_FILE):
+    """Read the registration sheet into team and member dicts keyed like the DB"""
+    teams = {}
+    members = {}
+    current_team_id = None
+    
+    with open(csv_file, 'r', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            if not any(row.values()):
+                continue
+            
+            if row['ID']:
+                current_team_id = f"T{row['ID'].zfill(3)}"
+                teams[current_team_id] = {
+                    'name': clean(row['Team Name']),
+                    'college': clean(row['College names']),
+                    'team_size': extract_team_size(row['Team Size']) if clean(row['Team Size']) else 2,
+                    'leader_name': clean(row['            Team Members']),
+                    'leader_email': clean(row['Team Leader Email']) or clean(row['Email Address']),
+                    'leader_phone': clean(row['      Phone no.']),
+                    'token': f"team_{row['ID'].zfill(3)}"
+                }
+            
+            name = clean(row.get('            Team Members'))
+            if current_team_id and name:
+                # First occurrence wins, as in import_teams()
+                members.setdefault(member_key(current_team_id, name), {
+                    'team_id': current_team_id,
+                    'name': name,
+                    'phone': clean(row['      Phone no.']) or None,
+                    'gender': clean(row['        Gender']) or None
+                })
+    
+    return teams, members
+
+def member_has_history(conn, member_id):
+    """Whether a member has any attendance log rows"""
+    return conn.execute(
+        'SELECT 1 FROM member_attendance_log WHERE member_id = ? LIMIT 1', (member_id,)
+    ).fetchone() is not None
+
+def team_has_history(conn, team_id):
+    """Whether a team or any of its members has attendance log rows"""
+    return conn.execute('''
+        SELECT 1 FROM team_attendance_log WHERE team_id = ?
+        UNION ALL
+        SELECT 1 FROM member_attendance_log l JOIN members m ON m.id = l.member_id
+        WHERE m.team_id = ?
+        LIMIT 1
+    ''', (team_id, team_id)).fetchone() is not None
+
+def diff_sheet(conn, teams, members):
+    """Compare the parsed sheet with the DB and return insert/update/delete lists"""
+    hashes = {
+        (row['entity'], row['key']): row['hash']
+        for row in conn.execute('SELECT entity, key, hash FROM import_hashes')
+    }
+    db_teams = {
+        row['team_id']: row
+        for row in conn.execute(f"SELECT team_id, {', '.join(TEAM_FIELDS)} FROM teams")
+    }
+    db_members = {
+        member_key(row['team_id'], row['name']): row
+        for row in conn.execute(f"SELECT id, team_id, name, {', '.join(MEMBER_FIELDS)} FROM members")
+    }
+    
+    diff = {
+        'teams': {'insert': [], 'update': [], 'delete': [], 'keep': []},
+        'members': {'insert': [], 'update': [], 'delete': [], 'keep': []},
+        'hashes': []
+    }
+    
+    for team_id, team in teams.items():
+        new_hash = row_hash(team[field] for field in TEAM_FIELDS)
+        if team_id not in db_teams:
+            diff['teams']['insert'].append(team_id)
+        else:
+            # Rows imported before hashes were kept are compared field by field
+            old_hash = hashes.get(('team', team_id)) or \
+                row_hash(db_teams[team_id][field] for field in TEAM_FIELDS)
+            if old_hash != new_hash:
+                diff['teams']['update'].append(team_id)
+            elif ('team', team_id) in hashes:
+                continue
+        diff['hashes'].append(('team', team_id, new_hash))
+    
+    for key, member in members.items():
+        new_hash = row_hash(member[field] for field in MEMBER_FIELDS)
+        if key not in db_members:
+            diff['members']['insert'].append(key)
+        else:
+            old_hash = hashes.get(('member', key)) or \
+                row_hash(db_members[key][field] for field in MEMBER_FIELDS)
+            if old_hash != new_hash:
+                diff['members']['update'].append(key)
+            elif ('member', key) in hashes:
+                continue
+        diff['hashes'].append(('member', key, new_hash))
+    
+    # Only rows that came from a previous sheet import are removed. Teams and
+    # members with attendance history are kept (and listed), since their log
+    # rows feed the presence and arrival tables.
+    for entity, key in hashes:
+        if entity == 'team' and key not in teams and key in db_teams:
+            action = 'keep' if team_has_history(conn, key) else 'delete'
+            diff['teams'][action].append(key)
+        elif entity == 'member' and key not in members and key in db_members:
+            action = 'keep' if member_has_history(conn, db_members[key]['id']) else 'delete'
+            diff['members'][action].append(key)
+    
+    # Kept rows keep their hash, so every later sync flags them again
+    kept = {('team', key) for key in diff['teams']['keep']} | \
+        {('member', key) for key in diff['members']['keep']}
+    diff['stale_hashes'] = [
+        (entity, key) for entity, key in hashes
+        if ((entity == 'team' and key not in teams) or (entity == 'member' and key not in members))
+        and (entity, key) not in kept
+    ]
+    
+    return diff
+
+def apply_diff(conn, diff, teams, members):
+    """Apply a sheet diff in a single transaction"""
+    with conn:
+        conn.executemany(f'''
+            INSERT INTO teams (team_id, {', '.join(TEAM_FIELDS)}, token)
+            VALUES (?, {', '.join('?' * len(TEAM_FIELDS))}, ?)
+        ''', [
+            (team_id, *(teams[team_id][field] for field in TEAM_FIELDS), teams[team_id]['token'])
+            for team_id in diff['teams']['insert']
+        ])
+        conn.executemany(f'''
+            UPDATE teams SET {', '.join(f'{field} = ?' for field in TEAM_FIELDS)}
+            WHERE team_id = ?
+        ''', [
+            (*(teams[team_id][field] for field in TEAM_FIELDS), team_id)
+            for team_id in diff['teams']['update']
+        ])
+        conn.executemany('''
+            INSERT INTO members (team_id, name, phone, gender, token) VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (members[key]['team_id'], members[key]['name'], members[key]['phone'],
+             members[key]['gender'], badges.new_token())
+            for key in diff['members']['insert']
+        ])
+        conn.executemany('''
+            UPDATE members SET phone = ?, gender = ? WHERE team_id = ? AND name = ?
+        ''', [
+            (members[key]['phone'], members[key]['gender'], members[key]['team_id'], members[key]['name'])
+            for key in diff['members']['update']
+        ])
+        conn.executemany(
+            'DELETE FROM members WHERE team_id = ? AND name = ?',
+            [tuple(key.split('\x1f', 1)) for key in diff['members']['delete']]
+        )
+        conn.executemany(
+            'DELETE FROM members WHERE team_id = ?',
+            [(team_id,) for team_id in diff['teams']['delete']]
+        )
+        conn.executemany(
+            'DELETE FROM teams WHERE team_id = ?',
+            [(team_id,) for team_id in diff['teams']['delete']]
+        )
+        conn.executemany(
+            'DELETE FROM import_hashes WHERE entity = ? AND key = ?', diff['stale_hashes']
+        )
+        conn.executemany('''
+            INSERT OR REPLACE INTO import_hashes (entity, key, hash) VALUES (?, ?, ?)
+        ''', diff['hashes'])
+
+def sync_teams(csv_file=CSV_FILE, dry_run=False):
+    """Re-import the sheet, applying only inserted, changed and removed rows"""
+    init_db()
+    teams, members = parse_sheet(csv_file)
+    
+    conn = get_db()
+    diff = diff_sheet(conn, teams, members)
+    
+    for entity in ('teams', 'members'):
+        changes = diff[entity]
+        print(f"{entity.capitalize()}: {len(changes['insert'])} new, "
+              f"{len(changes['update'])} changed, {len(changes['delete'])} removed, "
+              f"{len(changes['keep'])} kept (not in sheet but have attendance history)")
+        for action in ('insert', 'update', 'delete', 'keep'):
+            for key in changes[action][:20]:
+                print(f"  {action}: {str(key).replace(chr(31), ' / ')}")
+            if len(changes[action]) > 20:
+                print(f"  ... and {len(changes[action]) - 20} more")
+    
+    if dry_run:
+        print("Dry run: no changes applied")
+    else:
+        apply_diff(conn, diff, teams, members)
+        print("Sync applied")
+    
+    conn.close()
+    return diff
+
 if __name__ == '__main__':
-    # Initialize database
+    # Incremental re-import: python import_teams.py --sync [--dry-run] [file.csv]
+    if '--sync' in sys.argv:
+        paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+        sync_teams(paths[0] if paths else CSV_FILE, dry_run='--dry-run' in sys.argv)
+        sys.exit(0)
+    
+    # Initialize database (also adds badge tokens to older databases)
     if not os.path.exists(DATABASE):
         print("Initializing database...")
-        init_db()
+    init_db()
     
     # Import teams
     print("Importing teams...")
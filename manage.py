@@ -7,6 +7,8 @@ from io import StringIO
 import segno
 import sqlite3
 
+import badges
+
 DATABASE = 'hackathon.db'
 ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', 'admin123')
 BASE_URL = os.environ.get('BASE_URL', 'http://localhost:5000')
@@ -47,6 +49,7 @@ def init_db():
             name TEXT NOT NULL,
             phone TEXT NOT NULL,
             is_present INTEGER DEFAULT 0,
+            token TEXT,
             FOREIGN KEY (team_id) REFERENCES teams (team_id)
         )
     ''')
@@ -75,6 +78,9 @@ def init_db():
         )
     ''')
     
+    # Per-member badge tokens (added to older databases, backfilled)
+    badges.init_tables(conn)
+    
     conn.commit()
     conn.close()
     print("Database initialized successfully!")
@@ -125,12 +131,13 @@ def import_csv(csv_file):
                 # Insert member (always insert, even if team exists)
                 if row['member_name'].strip():
                     conn.execute('''
-                        INSERT INTO members (team_id, name, phone)
-                        VALUES (?, ?, ?)
+                        INSERT INTO members (team_id, name, phone, token)
+                        VALUES (?, ?, ?, ?)
                     ''', (
                         team_id,
                         row['member_name'].strip(),
-                        row['member_phone'].strip()
+                        row['member_phone'].strip(),
+                        badges.new_token()
                     ))
                     members_imported += 1
         
@@ -173,6 +180,380 @@ def generate_qrs():
     
     print(f"QR codes generated for {len(teams)} teams in 'qr_codes' directory")
 
+def generate_member_badges():
+    """Generate badge QR codes for every member"""
+    print("Generating member badges...")
+    
+    conn = get_db()
+    badges.init_tables(conn)
+    conn.commit()
+    members = conn.execute(
+        'SELECT id, team_id, name, token FROM members ORDER BY team_id, id'
+    ).fetchall()
+    conn.close()
+    
+    if not members:
+        print("No members found in database!")
+        return
+    
+    os.makedirs('qr_codes/members', exist_ok=True)
+    
+    for member in members:
+        filename = f"qr_codes/members/{member['team_id']}-{member['id']}.svg"
+        badges.make_qr(member['token']).save(
+            filename, scale=4, border=2, dark="black", light="white"
+        )
+    
+    print(f"Badges generated for {len(members)} members in 'qr_codes/members' directory")
+
+def build_assets():
+    """Pre-compress static files so the server can send them without recompressing"""
+    import assets
+    
+    print("Building compressed static assets...")
+    report = assets.build('static')
+    
+    for name, sizes in report:
+        parts = [f"{encoding}: {size:,} bytes" for encoding, size in sizes.items() if encoding != 'original']
+        print(f"{name}: {sizes['original']:,} bytes -> " + ", ".join(parts))
+    
+    print(f"Compressed variants written for {len(report)} files")
+
+def export_data(kind, fmt='csv', output=None):
+    """Stream an export to a file or stdout"""
+    import export
+    
+    error = export.validate(kind, fmt)
+    if error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    
+    conn = get_db()
+    out = open(output, 'w', newline='', encoding='utf-8') if output else sys.stdout
+    try:
+        for chunk in export.iter_export(conn, kind, fmt):
+            out.write(chunk)
+    finally:
+        conn.close()
+        if output:
+            out.close()
+    
+    if output:
+        print(f"Exported {kind} to {output}", file=sys.stderr)
+
+def bench_presence(days=3, members=2000):
+    """Compare presence index queries with naive log replay on a synthetic log"""
+    import random
+    import tempfile
+    import time
+    import presence
+    from analytics import format_time
+    
+    print(f"Building synthetic log: {members} members over {days} days...")
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE team_attendance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, team_id TEXT NOT NULL,
+            action TEXT NOT NULL, by_who TEXT NOT NULL, at TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE member_attendance_log (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, member_id INTEGER NOT NULL,
+            action TEXT NOT NULL, by_who TEXT NOT NULL, at TIMESTAMP
+        )
+    ''')
+    
+    # Members come and go in random in/out pairs through the event
+    rng = random.Random(42)
+    start = 1767225600  # 2026-01-01 00:00 UTC
+    end = start + days * 24 * 3600
+    events = []
+    for member_id in range(1, members + 1):
+        at = start + rng.randint(0, 6 * 3600)
+        while at < end:
+            events.append((at, member_id, 'in'))
+            at += rng.randint(1800, 8 * 3600)
+            if at >= end:
+                break
+            events.append((at, member_id, 'out'))
+            at += rng.randint(300, 2 * 3600)
+    events.sort()
+    conn.executemany(
+        'INSERT INTO member_attendance_log (member_id, action, by_who, at) VALUES (?, ?, ?, ?)',
+        [(member_id, action, 'bench', format_time(at)) for at, member_id, action in events]
+    )
+    
+    # Backdated offline outs synced after the fact: older than the member's
+    # latest action, so sync marks them stale and presence must not change
+    last_action = {}
+    for at, member_id, action in events:
+        last_action[member_id] = (at, action)
+    stale = []
+    for member_id, (at, action) in list(last_action.items())[::10]:
+        stale.append((at - rng.randint(1, 1800), member_id, 'out' if action == 'in' else 'in'))
+    conn.executemany(
+        'INSERT INTO member_attendance_log (member_id, action, by_who, at) VALUES (?, ?, ?, ?)',
+        [(member_id, action, 'bench', format_time(at)) for at, member_id, action in stale]
+    )
+    conn.commit()
+    print(f"Log rows: {len(events) + len(stale):,} ({len(stale)} stale)")
+    
+    started = time.perf_counter()
+    presence.catch_up(conn)
+    print(f"Index build (catch-up from empty): {time.perf_counter() - started:.2f}s")
+    
+    samples = [rng.randint(start, end) for _ in range(20)]
+    
+    started = time.perf_counter()
+    indexed = [presence.headcount_at(conn, 'member', at) for at in samples]
+    index_ms = (time.perf_counter() - started) * 1000 / len(samples)
+    
+    started = time.perf_counter()
+    replayed = [presence.replay_headcount(conn, 'member', at) for at in samples]
+    replay_ms = (time.perf_counter() - started) * 1000 / len(samples)
+    
+    started = time.perf_counter()
+    presence.timeline(conn, 'member', start, end)
+    timeline_ms = (time.perf_counter() - started) * 1000
+    
+    # After the event, everyone whose latest (non-stale) action was 'in' is present
+    expected = sum(1 for at, action in last_action.values() if action == 'in')
+    final = (presence.headcount_at(conn, 'member', end), presence.replay_headcount(conn, 'member', end))
+    
+    conn.close()
+    os.remove(path)
+    
+    print(f"Headcount at T, interval index: {index_ms:.2f} ms/query")
+    print(f"Headcount at T, log replay:     {replay_ms:.2f} ms/query")
+    print(f"Hourly timeline over {days * 24} hours:  {timeline_ms:.2f} ms")
+    print(f"Headcount at end: index {final[0]}, replay {final[1]}, expected {expected}")
+    if indexed != replayed or final != (expected, expected):
+        print("ERROR: headcounts disagree")
+        sys.exit(1)
+    print("Results match")
+
+# bench-admission pass criteria, relative to the scans-only run
+ADMISSION_P99_FACTOR = 3
+ADMISSION_P99_SLACK_MS = 50
+
+def bench_admission(teams=1000, dashboards=16, scans=300):
+    """Measure gate scan latency while dashboards hammer /api/stats"""
+    import json
+    import socket
+    import subprocess
+    import tempfile
+    import threading
+    import time
+    import urllib.error
+    import urllib.request
+    
+    # Run against a throwaway database so no real check-ins are logged
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    conn = sqlite3.connect(path)
+    conn.close()
+    server_code = (
+        "import logging, sys, app; "
+        "logging.getLogger('werkzeug').setLevel(logging.ERROR); "
+        "app.DATABASE = sys.argv[1]; "
+        "app.app.run(host='127.0.0.1', port=int(sys.argv[2]), threaded=True)"
+    )
+    
+    import app as web
+    web.DATABASE = path
+    web.init_db()
+    conn = web.get_db()
+    conn.executemany('''
+        INSERT INTO teams (team_id, name, college, leader_name, leader_email, leader_phone, token)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(f"T{i:04d}", f"Team {i}", f"College {i % 40}", 'Leader', 'l@example.com', '0', f"bench_{i}")
+          for i in range(teams)])
+    conn.executemany(
+        'INSERT INTO members (team_id, name, phone) VALUES (?, ?, ?)',
+        [(f"T{i:04d}", f"Member {i}-{j}", '0') for i in range(teams) for j in range(4)]
+    )
+    conn.commit()
+    conn.close()
+    
+    def start_server(admission_enabled):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+        env = dict(os.environ, ADMISSION_CONTROL='1' if admission_enabled else '0')
+        process = subprocess.Popen(
+            [sys.executable, '-c', server_code, path, str(port)],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        base = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                urllib.request.urlopen(base + '/api/team/by-token?token=bench_0').read()
+                return process, base
+            except OSError:
+                time.sleep(0.1)
+        process.kill()
+        raise RuntimeError("Benchmark server did not start")
+    
+    def scan(base, i):
+        body = json.dumps({'token': f"bench_{i % teams}", 'action': 'in', 'by_who': 'bench'}).encode()
+        req = urllib.request.Request(
+            base + '/api/team/action', data=body, headers={'Content-Type': 'application/json'}
+        )
+        started = time.perf_counter()
+        urllib.request.urlopen(req).read()
+        return (time.perf_counter() - started) * 1000
+    
+    def dashboard(base, stop, outcomes):
+        while not stop.is_set():
+            # Shed responses carry Retry-After; clients back off as told
+            try:
+                response = urllib.request.urlopen(base + '/api/stats')
+                response.read()
+                outcomes.append('stale' if response.headers.get('X-Cache') == 'stale' else 'fresh')
+            except urllib.error.HTTPError as e:
+                response = e
+                e.read()
+                outcomes.append('rejected')
+            stop.wait(float(response.headers.get('Retry-After', 0)))
+    
+    def run(label, dashboard_threads, admission_enabled):
+        process, base = start_server(admission_enabled)
+        stop = threading.Event()
+        outcomes = []
+        workers = [
+            threading.Thread(target=dashboard, args=(base, stop, outcomes))
+            for _ in range(dashboard_threads)
+        ]
+        try:
+            for worker in workers:
+                worker.start()
+            time.sleep(1 if dashboard_threads else 0)
+            latencies = sorted(scan(base, i) for i in range(scans))
+        finally:
+            stop.set()
+            for worker in workers:
+                worker.join()
+            process.terminate()
+            process.wait()
+        
+        p50 = latencies[len(latencies) // 2]
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        counts = {outcome: outcomes.count(outcome) for outcome in ('fresh', 'stale', 'rejected')}
+        print(f"{label:<40} p50 {p50:7.1f} ms   p99 {p99:7.1f} ms   dashboards {counts}")
+        return p99, counts
+    
+    print(f"{teams} teams, {teams * 4} members, {scans} scans per run")
+    baseline, _ = run("Scans only", 0, True)
+    run(f"Scans + {dashboards} dashboards, no admission", dashboards, False)
+    p99, counts = run(f"Scans + {dashboards} dashboards, admission", dashboards, True)
+    os.remove(path)
+    
+    # Scans must stay close to the unloaded gate, and dashboards must still get answers
+    bound = max(baseline * ADMISSION_P99_FACTOR, baseline + ADMISSION_P99_SLACK_MS)
+    failed = False
+    if p99 > bound:
+        print(f"FAIL: scan p99 {p99:.1f} ms with admission exceeds {bound:.1f} ms")
+        failed = True
+    if dashboards and counts['fresh'] + counts['stale'] == 0:
+        print("FAIL: dashboards got no fresh or stale responses with admission")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print(f"OK: scan p99 within {bound:.1f} ms, dashboards still served")
+
+def bench_checkin(teams=200, rtt_ms=100):
+    """Compare member check-in through the team page with one-scan badges"""
+    import tempfile
+    import time
+    
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    import app as web
+    web.DATABASE = path
+    web.init_db()
+    conn = web.get_db()
+    conn.executemany('''
+        INSERT INTO teams (team_id, name, college, leader_name, leader_email, leader_phone, token)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(f"T{i:04d}", f"Team {i}", 'College', 'Leader', 'l@example.com', '0', f"bench_{i}")
+          for i in range(teams)])
+    conn.executemany(
+        'INSERT INTO members (team_id, name, phone, token) VALUES (?, ?, ?, ?)',
+        [(f"T{i:04d}", f"Member {i}-{j}", '0', badges.new_token())
+         for i in range(teams) for j in range(4)]
+    )
+    conn.commit()
+    roster = {}
+    for member in conn.execute('SELECT id, team_id, token FROM members ORDER BY id'):
+        roster.setdefault(member['team_id'], []).append(member)
+    conn.close()
+    
+    client = web.app.test_client()
+    
+    def reset():
+        conn = web.get_db()
+        conn.execute('UPDATE members SET is_present = 0')
+        conn.execute('UPDATE teams SET is_present = 0')
+        conn.commit()
+        conn.close()
+    
+    def team_page(reload_after_click):
+        # Scan the team code, open the team page, click each member
+        requests = 0
+        for i, (team_id, members) in enumerate(roster.items()):
+            client.get(f"/scan?t=bench_{i}")
+            requests += 1
+            for member in members:
+                client.post('/api/member/action', json={
+                    'member_id': member['id'], 'action': 'in', 'by_who': 'bench'
+                })
+                requests += 1
+                if reload_after_click:
+                    client.get(f"/scan?t=bench_{i}")
+                    requests += 1
+        return requests
+    
+    def badge_scan():
+        # Scan each member's own badge; one request checks them in
+        requests = 0
+        for members in roster.values():
+            for member in members:
+                client.post('/api/member/checkin', json={
+                    'token': member['token'], 'by_who': 'bench'
+                })
+                requests += 1
+        return requests
+    
+    people = teams * 4
+    print(f"{teams} teams, {people} members, {rtt_ms} ms assumed network round trip")
+    for label, flow in (
+        ("Team page, reload after each click", lambda: team_page(True)),
+        ("Team page, no reload", lambda: team_page(False)),
+        ("Member badge, one scan", badge_scan),
+    ):
+        reset()
+        started = time.perf_counter()
+        requests = flow()
+        server_ms = (time.perf_counter() - started) * 1000 / people
+        per_person = requests / people
+        print(f"{label:<36} {per_person:4.2f} requests/person   "
+              f"server {server_ms:5.2f} ms/person   "
+              f"with round trips ~{server_ms + per_person * rtt_ms:6.1f} ms/person")
+    
+    os.remove(path)
+
+def bench_dashboard(team_counts):
+    """Run the DOM-less dashboard render benchmark (needs node)"""
+    import subprocess
+    
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bench', 'dashboard-render.js')
+    try:
+        return subprocess.call(['node', script, *team_counts])
+    except FileNotFoundError:
+        print("Error: node is required for bench-dashboard")
+        return 1
+
 def show_help():
     """Show help information"""
     print("""
@@ -183,13 +564,30 @@ Usage: python manage.py <command> [arguments]
 Commands:
     init-db                 Initialize the database
     import-csv <file>       Import teams/members from CSV file
-    generate-qrs            Generate QR codes for all teams
+    generate-qrs [--members]
+                            Generate QR codes for all teams (and member badges)
+    build-assets            Write pre-compressed (.gz/.br) static files
+    export <kind> [--format csv|jsonl] [--output <file>]
+                            Export teams, members, presence, team_log,
+                            member_log (or all, as jsonl)
+    bench-presence [days] [members]
+                            Benchmark presence queries against log replay
+    bench-admission [teams] [dashboards]
+                            Measure scan latency under dashboard load
+    bench-checkin [teams] [rtt_ms]
+                            Compare team-page and badge member check-in
+    bench-dashboard [teams...]
+                            Count dashboard DOM work per refresh (node)
     help                    Show this help message
 
 Examples:
     python manage.py init-db
     python manage.py import-csv example.csv
     python manage.py generate-qrs
+    python manage.py generate-qrs --members
+    python manage.py build-assets
+    python manage.py export presence --output presence.csv
+    python manage.py export all --format jsonl > attendance.jsonl
     """)
 
 if __name__ == '__main__':
@@ -209,6 +607,33 @@ if __name__ == '__main__':
         import_csv(sys.argv[2])
     elif command == 'generate-qrs':
         generate_qrs()
+        if '--members' in sys.argv:
+            generate_member_badges()
+    elif command == 'build-assets':
+        build_assets()
+    elif command == 'export':
+        if len(sys.argv) < 3:
+            print("Error: export kind required")
+            print("Usage: python manage.py export <kind> [--format csv|jsonl] [--output <file>]")
+            sys.exit(1)
+        options = sys.argv[3:]
+        fmt = options[options.index('--format') + 1] if '--format' in options else 'csv'
+        output = options[options.index('--output') + 1] if '--output' in options else None
+        export_data(sys.argv[2], fmt, output)
+    elif command == 'bench-presence':
+        days = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+        members = int(sys.argv[3]) if len(sys.argv) > 3 else 2000
+        bench_presence(days, members)
+    elif command == 'bench-admission':
+        teams = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+        dashboards = int(sys.argv[3]) if len(sys.argv) > 3 else 16
+        bench_admission(teams, dashboards)
+    elif command == 'bench-checkin':
+        teams = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+        rtt_ms = int(sys.argv[3]) if len(sys.argv) > 3 else 100
+        bench_checkin(teams, rtt_ms)
+    elif command == 'bench-dashboard':
+        sys.exit(bench_dashboard(sys.argv[2:]))
     elif command == 'help':
         show_help()
     else:
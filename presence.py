@@ -0,0 +1,260 @@
+"""Point-in-time presence built from the attendance logs.
+
+Each in/out pair becomes a presence interval. Alongside the intervals,
+per-minute and per-hour net deltas (arrivals minus departures) are kept,
+so the headcount at any moment is a sum over at most one row per elapsed
+hour plus the minutes of the current hour, instead of a replay of the log.
+Like the arrival analytics, everything is caught up from the last
+processed log id. Actions older than the entity's latest logged action
+(backdated offline scans that /api/sync reports as stale) are skipped.
+"""
+import time
+
+from analytics import parse_log_time, format_time, CATCH_UP_CHUNK, CATCH_UP_PAUSE
+
+KINDS = ('team', 'member')
+MAX_TIMELINE_HOURS = 31 * 24
+# Last second datetime can format (9999-12-31 23:59:59 UTC)
+MAX_QUERY_TIME = 253402300799
+
+def init_tables(conn):
+    """Create presence interval and delta tables if they don't exist"""
+    # Indexes built before the latest-time table existed applied stale
+    # actions; drop them so the next catch-up rebuilds from the log
+    tables = {row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'presence_%'"
+    )}
+    if 'presence_state' in tables and 'presence_latest' not in tables:
+        for table in ('presence_intervals', 'presence_minutes', 'presence_hours', 'presence_state'):
+            conn.execute(f'DROP TABLE {table}')
+    
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS presence_intervals (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            start_at INTEGER NOT NULL,
+            end_at INTEGER
+        )
+    ''')
+    # At most one open interval per team or member
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_presence_open
+        ON presence_intervals (kind, entity_id) WHERE end_at IS NULL
+    ''')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_presence_start ON presence_intervals (kind, start_at)'
+    )
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_presence_end ON presence_intervals (kind, end_at)'
+    )
+
+    # Net arrivals minus departures per minute and per hour (epoch // 60, // 3600)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS presence_minutes (
+            kind TEXT NOT NULL,
+            minute INTEGER NOT NULL,
+            delta INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, minute)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS presence_hours (
+            kind TEXT NOT NULL,
+            hour INTEGER NOT NULL,
+            delta INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, hour)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS presence_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_team_log_id INTEGER NOT NULL DEFAULT 0,
+            last_member_log_id INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('INSERT OR IGNORE INTO presence_state (id) VALUES (1)')
+    
+    # Latest logged gate time per team or member, for the last-writer-wins rule
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS presence_latest (
+            kind TEXT NOT NULL,
+            entity_id TEXT NOT NULL,
+            at INTEGER NOT NULL,
+            PRIMARY KEY (kind, entity_id)
+        )
+    ''')
+
+def parse_time(value):
+    """Parse a query time: epoch seconds or 'YYYY-MM-DD HH:MM[:SS]' in UTC"""
+    value = value.strip()
+    if value.isdigit():
+        at = int(value)
+        if at > MAX_QUERY_TIME:
+            raise ValueError(f'time out of range: {value}')
+        return at
+    return parse_log_time(value)
+
+def _add_delta(conn, kind, at, delta):
+    conn.execute('''
+        INSERT INTO presence_minutes (kind, minute, delta) VALUES (?, ?, ?)
+        ON CONFLICT (kind, minute) DO UPDATE SET delta = delta + excluded.delta
+    ''', (kind, at // 60, delta))
+    conn.execute('''
+        INSERT INTO presence_hours (kind, hour, delta) VALUES (?, ?, ?)
+        ON CONFLICT (kind, hour) DO UPDATE SET delta = delta + excluded.delta
+    ''', (kind, at // 3600, delta))
+
+def apply_action(conn, kind, entity_id, action, at):
+    """Open or close the entity's interval; repeated ins or outs are no-ops"""
+    entity_id = str(entity_id)
+    
+    # Same rule as sync: an action older than the entity's latest logged
+    # action is kept in the log only (/api/sync reports it as stale)
+    latest = conn.execute(
+        'SELECT at FROM presence_latest WHERE kind = ? AND entity_id = ?', (kind, entity_id)
+    ).fetchone()
+    if latest is not None and latest[0] > at:
+        return
+    conn.execute('''
+        INSERT INTO presence_latest (kind, entity_id, at) VALUES (?, ?, ?)
+        ON CONFLICT (kind, entity_id) DO UPDATE SET at = excluded.at
+    ''', (kind, entity_id, at))
+    
+    open_interval = conn.execute('''
+        SELECT id, start_at FROM presence_intervals
+        WHERE kind = ? AND entity_id = ? AND end_at IS NULL
+    ''', (kind, entity_id)).fetchone()
+
+    if action == 'in' and not open_interval:
+        conn.execute(
+            'INSERT INTO presence_intervals (kind, entity_id, start_at) VALUES (?, ?, ?)',
+            (kind, entity_id, at)
+        )
+        _add_delta(conn, kind, at, 1)
+    elif action == 'out' and open_interval:
+        # A backdated out never produces a negative-length interval
+        end_at = max(at, open_interval[1])
+        conn.execute(
+            'UPDATE presence_intervals SET end_at = ? WHERE id = ?',
+            (end_at, open_interval[0])
+        )
+        _add_delta(conn, kind, end_at, -1)
+
+def catch_up(conn):
+    """Fold log rows added since the last catch-up into the interval index"""
+    init_tables(conn)
+    conn.commit()
+
+    processed = 0
+    for kind, table, column in (
+        ('team', 'team_attendance_log', 'team_id'),
+        ('member', 'member_attendance_log', 'member_id'),
+    ):
+        while True:
+            # One short write transaction per chunk, like analytics.catch_up(),
+            # so a rebuild from a long log never blocks gate writes for long
+            conn.execute('BEGIN IMMEDIATE')
+            last_id = conn.execute(
+                f'SELECT last_{kind}_log_id FROM presence_state WHERE id = 1'
+            ).fetchone()[0]
+            rows = conn.execute(f'''
+                SELECT id, {column}, action, at FROM {table}
+                WHERE id > ? ORDER BY id LIMIT ?
+            ''', (last_id, CATCH_UP_CHUNK)).fetchall()
+            if not rows:
+                conn.commit()
+                break
+            for row in rows:
+                apply_action(conn, kind, row[1], row[2], parse_log_time(row[3]))
+            conn.execute(
+                f'UPDATE presence_state SET last_{kind}_log_id = ? WHERE id = 1', (rows[-1][0],)
+            )
+            conn.commit()
+            processed += len(rows)
+            if len(rows) < CATCH_UP_CHUNK:
+                break
+            time.sleep(CATCH_UP_PAUSE)
+
+    return processed
+
+def _count_before_minute(conn, kind, minute):
+    """Headcount just before the start of the given minute"""
+    hour_start = minute // 60
+    from_hours = conn.execute(
+        'SELECT COALESCE(SUM(delta), 0) FROM presence_hours WHERE kind = ? AND hour < ?',
+        (kind, hour_start)
+    ).fetchone()[0]
+    from_minutes = conn.execute('''
+        SELECT COALESCE(SUM(delta), 0) FROM presence_minutes
+        WHERE kind = ? AND minute >= ? AND minute < ?
+    ''', (kind, hour_start * 60, minute)).fetchone()[0]
+    return from_hours + from_minutes
+
+def headcount_at(conn, kind, at):
+    """Number of teams or members present at epoch second ``at``"""
+    minute_start = at - at % 60
+    count = _count_before_minute(conn, kind, at // 60)
+
+    # Exact correction inside the current minute from the interval index
+    started = conn.execute('''
+        SELECT COUNT(*) FROM presence_intervals
+        WHERE kind = ? AND start_at BETWEEN ? AND ?
+    ''', (kind, minute_start, at)).fetchone()[0]
+    ended = conn.execute('''
+        SELECT COUNT(*) FROM presence_intervals
+        WHERE kind = ? AND end_at BETWEEN ? AND ?
+    ''', (kind, minute_start, at)).fetchone()[0]
+    return count + started - ended
+
+def timeline(conn, kind, start, end):
+    """Hourly headcount (at hour start, peak and end) for [start, end]"""
+    first_hour = start // 3600
+    last_hour = end // 3600
+    count = _count_before_minute(conn, kind, first_hour * 60)
+
+    deltas = dict(conn.execute('''
+        SELECT minute, delta FROM presence_minutes
+        WHERE kind = ? AND minute >= ? AND minute < ?
+    ''', (kind, first_hour * 60, (last_hour + 1) * 60)).fetchall())
+
+    hours = []
+    for hour in range(first_hour, last_hour + 1):
+        at_start = count
+        peak = count
+        for minute in range(hour * 60, hour * 60 + 60):
+            if minute in deltas:
+                count += deltas[minute]
+                peak = max(peak, count)
+        hours.append({
+            'hour': format_time(hour * 3600),
+            'start': at_start,
+            'peak': peak,
+            'end': count
+        })
+    return hours
+
+def replay_headcount(conn, kind, at):
+    """Reference implementation: replay the whole log up to ``at``"""
+    table, column = (
+        ('team_attendance_log', 'team_id') if kind == 'team'
+        else ('member_attendance_log', 'member_id')
+    )
+    present = set()
+    latest = {}
+    for entity_id, action, logged_at in conn.execute(
+        f'SELECT {column}, action, at FROM {table} ORDER BY id'
+    ):
+        logged_at = parse_log_time(logged_at)
+        # Stale actions (older than the entity's latest) never change presence
+        if latest.get(entity_id, logged_at) > logged_at:
+            continue
+        latest[entity_id] = logged_at
+        if logged_at > at:
+            continue
+        if action == 'in':
+            present.add(entity_id)
+        else:
+            present.discard(entity_id)
+    return len(present)
@@ -0,0 +1,115 @@
+"""Optional read replica refreshed with the SQLite online backup API.
+
+When enabled, a background thread periodically copies the primary database
+into a separate file with ``sqlite3.Connection.backup`` and swaps it in
+atomically. Read-only endpoints open the replica instead of the primary as
+long as it is younger than the staleness bound; otherwise they fall back to
+the primary, so a stalled refresh never serves data older than the bound.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+ENABLED = os.environ.get('READ_REPLICA', '0') == '1'
+REPLICA_PATH = os.environ.get('REPLICA_PATH', 'hackathon-replica.db')
+REFRESH_INTERVAL = float(os.environ.get('REPLICA_INTERVAL', 5))
+MAX_STALENESS = float(os.environ.get('REPLICA_MAX_STALENESS', 15))
+
+class ReadReplica:
+    """Periodically refreshed read-only copy of the primary database"""
+
+    def __init__(self, primary_path, path=REPLICA_PATH, interval=REFRESH_INTERVAL,
+                 max_staleness=MAX_STALENESS, enabled=ENABLED):
+        # primary_path is a callable so a reconfigured DATABASE is picked up
+        self.primary_path = primary_path
+        self.path = path
+        self.interval = interval
+        self.max_staleness = max_staleness
+        self.enabled = enabled
+        self._thread = None
+        self._lock = threading.Lock()
+        self.snapshot_at = None
+        self.stats = {
+            'refreshes': 0,
+            'errors': 0,
+            'last_error': None,
+            'last_refresh_ms': None,
+            'size_bytes': None,
+            'reads_replica': 0,
+            'reads_primary': 0
+        }
+
+    def refresh(self):
+        """Copy the primary into the replica file and swap it in"""
+        started_at = time.time()
+        started = time.perf_counter()
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+
+        source = sqlite3.connect(self.primary_path())
+        target = sqlite3.connect(tmp_path)
+        try:
+            source.backup(target)
+            # The copy keeps the primary's WAL flag; readers open it read-only
+            target.execute('PRAGMA journal_mode=DELETE')
+        finally:
+            target.close()
+            source.close()
+        os.replace(tmp_path, self.path)
+
+        self.snapshot_at = started_at
+        self.stats['refreshes'] += 1
+        self.stats['last_refresh_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        self.stats['size_bytes'] = os.path.getsize(self.path)
+
+    def _run(self):
+        while True:
+            try:
+                self.refresh()
+            except (sqlite3.Error, OSError) as e:
+                self.stats['errors'] += 1
+                self.stats['last_error'] = str(e)
+            time.sleep(self.interval)
+
+    def ensure_started(self):
+        """Start the refresh thread on first use"""
+        if not self.enabled or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def lag(self):
+        """Seconds since the current replica snapshot was taken, or None"""
+        if self.snapshot_at is None:
+            return None
+        return time.time() - self.snapshot_at
+
+    def connect(self):
+        """Open the replica read-only, or return None if it is missing or too stale"""
+        self.ensure_started()
+        lag = self.lag()
+        if not self.enabled or lag is None or lag > self.max_staleness:
+            self.stats['reads_primary'] += 1
+            return None
+
+        try:
+            conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+        except sqlite3.Error:
+            self.stats['reads_primary'] += 1
+            return None
+        conn.row_factory = sqlite3.Row
+        self.stats['reads_replica'] += 1
+        return conn
+
+    def metrics(self):
+        lag = self.lag()
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'refresh_interval': self.interval,
+            'max_staleness': self.max_staleness,
+            'lag_seconds': round(lag, 2) if lag is not None else None,
+            **self.stats
+        }
@@ -0,0 +1,286 @@
+// Dashboard team list: keyed by team_id, virtualized, patched in place.
+// Only the rows inside the scroll window exist in the DOM, and a refresh
+// touches only the rows whose data actually changed, so the work per update
+// follows the number of changes rather than the number of teams.
+const DEFAULT_ROW_HEIGHT = 140;
+const ROW_GAP = 16;
+const OVERSCAN_ROWS = 4;
+
+// Fields shown in a row; a change to any of them patches that row
+const ROW_FIELDS = ['name', 'team_id', 'college', 'is_present', 'members_present', 'member_count'];
+
+class TeamListView {
+    constructor(container, options = {}) {
+        this.container = container;
+        this.doc = options.document || container.ownerDocument;
+        this.onSelect = options.onSelect || (() => {});
+        this.rowHeight = options.rowHeight || DEFAULT_ROW_HEIGHT;
+        this.overscan = options.overscan === undefined ? OVERSCAN_ROWS : options.overscan;
+        this.measured = Boolean(options.rowHeight);
+
+        this.teams = new Map();          // team_id -> team, in server order
+        this.order = [];                 // team_ids as last sent by the server
+        this.loaded = false;
+        this.filter = 'all';
+        this.visibleIds = [];            // team_ids passing the filter, in order
+        this.positions = new Map();      // team_id -> index in visibleIds
+        this.rows = new Map();           // team_id -> mounted row
+        this.pool = [];                  // unmounted rows kept for reuse
+        this.dirty = new Set();          // mounted rows whose data changed
+        this.renderScheduled = false;
+
+        // Render work counters, read by bench/dashboard-render.js
+        this.work = { created: 0, filled: 0, patched: 0, moved: 0, unmounted: 0 };
+
+        this.container.textContent = '';
+        this.container.classList.add('virtual-list');
+        this.spacer = this.doc.createElement('div');
+        this.spacer.className = 'virtual-spacer';
+        this.container.appendChild(this.spacer);
+        this.message = null;
+
+        if (this.container.addEventListener) {
+            this.container.addEventListener('scroll', () => this.scheduleRender());
+            // One listener for every row, including ones created later
+            this.container.addEventListener('click', event => {
+                const row = event.target.closest && event.target.closest('.team-row');
+                if (row) this.onSelect(row.dataset.teamId);
+            });
+        }
+    }
+
+    get(teamId) {
+        return this.teams.get(teamId);
+    }
+
+    // Merge a fresh team list from /api/stats; returns the ids that changed
+    update(teamList) {
+        const changed = [];
+        // Adds, removals, reordering and filter moves change which rows are listed
+        let membershipChanged = !this.loaded || teamList.length !== this.order.length;
+
+        teamList.forEach((incoming, i) => {
+            const id = incoming.team_id;
+            const current = this.teams.get(id);
+            if (this.order[i] !== id) membershipChanged = true;
+            if (!current) {
+                this.teams.set(id, incoming);
+                return;
+            }
+            if (ROW_FIELDS.some(field => current[field] !== incoming[field])) {
+                if (current.is_present !== incoming.is_present && this.filter !== 'all') {
+                    membershipChanged = true;
+                }
+                changed.push(id);
+            }
+            // Keep the same object so references held elsewhere stay valid
+            Object.assign(current, incoming);
+        });
+
+        if (membershipChanged) {
+            // Rebuild in server (name) order, dropping teams that disappeared
+            this.order = teamList.map(team => team.team_id);
+            this.teams = new Map(this.order.map(id => [id, this.teams.get(id)]));
+        }
+        this.loaded = true;
+
+        this.markChanged(changed, membershipChanged);
+        return changed;
+    }
+
+    // Apply a local change (e.g. after a dashboard action) to one team
+    patch(teamId, fields) {
+        const team = this.teams.get(teamId);
+        if (!team) return;
+        const filterAffected = 'is_present' in fields && fields.is_present !== team.is_present
+            && this.filter !== 'all';
+        Object.assign(team, fields);
+        this.markChanged([teamId], filterAffected);
+    }
+
+    setFilter(filter) {
+        if (filter === this.filter) return;
+        this.filter = filter;
+        this.markChanged([], true);
+    }
+
+    matchesFilter(team) {
+        if (this.filter === 'present') return team.is_present === 1;
+        if (this.filter === 'absent') return team.is_present === 0;
+        return true;
+    }
+
+    markChanged(ids, membershipChanged) {
+        if (membershipChanged) this.rebuildIndex();
+        ids.forEach(id => {
+            if (this.rows.has(id)) this.dirty.add(id);
+        });
+        this.renderNow();
+    }
+
+    rebuildIndex() {
+        this.visibleIds = [];
+        this.positions = new Map();
+        for (const [id, team] of this.teams) {
+            if (this.matchesFilter(team)) {
+                this.positions.set(id, this.visibleIds.length);
+                this.visibleIds.push(id);
+            }
+        }
+        this.spacer.style.height = `${this.visibleIds.length * this.rowHeight}px`;
+    }
+
+    scheduleRender() {
+        if (this.renderScheduled) return;
+        this.renderScheduled = true;
+        const run = () => {
+            this.renderScheduled = false;
+            this.renderNow();
+        };
+        if (typeof requestAnimationFrame === 'function') requestAnimationFrame(run);
+        else run();
+    }
+
+    visibleRange() {
+        const scrollTop = this.container.scrollTop || 0;
+        const height = this.container.clientHeight || this.rowHeight * 10;
+        const first = Math.max(0, Math.floor(scrollTop / this.rowHeight) - this.overscan);
+        const last = Math.min(
+            this.visibleIds.length,
+            Math.ceil((scrollTop + height) / this.rowHeight) + this.overscan
+        );
+        return [first, last];
+    }
+
+    renderNow() {
+        if (this.loaded) this.showMessage(this.visibleIds.length ? null : 'No teams found');
+        const [first, last] = this.visibleRange();
+
+        // Unmount rows that scrolled or filtered out of the window
+        for (const [id, row] of this.rows) {
+            const index = this.positions.get(id);
+            if (index === undefined || index < first || index >= last) {
+                row.el.remove();
+                this.rows.delete(id);
+                this.dirty.delete(id);
+                this.pool.push(row);
+                this.work.unmounted++;
+            }
+        }
+
+        for (let index = first; index < last; index++) {
+            const id = this.visibleIds[index];
+            let row = this.rows.get(id);
+            if (!row) {
+                row = this.pool.pop() || this.createRow();
+                this.fillRow(row, this.teams.get(id));
+                this.rows.set(id, row);
+                this.spacer.appendChild(row.el);
+                this.work.filled++;
+            } else if (this.dirty.has(id)) {
+                this.fillRow(row, this.teams.get(id));
+                this.work.patched++;
+            }
+            if (row.index !== index) {
+                row.index = index;
+                row.el.style.top = `${index * this.rowHeight}px`;
+                this.work.moved++;
+            }
+        }
+        this.dirty.clear();
+        this.measureRowHeight();
+    }
+
+    createRow() {
+        const el = this.doc.createElement('div');
+        const info = this.append(el, 'div', 'team-main-info');
+        const stats = this.append(el, 'div', 'team-stats');
+        const count = this.append(stats, 'div', 'member-count');
+        const row = {
+            el: el,
+            index: -1,
+            name: this.append(info, 'h3'),
+            teamId: this.append(info, 'p', 'team-id'),
+            college: this.append(info, 'p', 'team-college'),
+            present: this.append(count, 'span', 'present'),
+            total: this.append(count, 'span', 'total'),
+            status: this.append(stats, 'span'),
+            values: {}
+        };
+        count.insertBefore(this.doc.createTextNode(' / '), row.total);
+        count.appendChild(this.doc.createTextNode(' members present'));
+        this.work.created++;
+        return row;
+    }
+
+    append(parent, tag, className) {
+        const el = this.doc.createElement(tag);
+        if (className) el.className = className;
+        parent.appendChild(el);
+        return el;
+    }
+
+    // Write only the fields that differ from what the row already shows
+    fillRow(row, team) {
+        const present = team.is_present === 1;
+        const next = {
+            rowClass: `team-row ${present ? 'team-present' : 'team-absent'}`,
+            id: team.team_id,
+            name: team.name,
+            teamId: `ID: ${team.team_id}`,
+            college: team.college,
+            present: String(team.members_present || 0),
+            total: String(team.member_count),
+            statusClass: `team-status ${present ? 'status-present' : 'status-absent'}`,
+            status: present ? '✅ Team Present' : '❌ Team Absent'
+        };
+        const old = row.values;
+        if (old.rowClass !== next.rowClass) row.el.className = next.rowClass;
+        if (old.id !== next.id) row.el.dataset.teamId = next.id;
+        if (old.statusClass !== next.statusClass) row.status.className = next.statusClass;
+        for (const key of ['name', 'teamId', 'college', 'present', 'total', 'status']) {
+            if (old[key] !== next[key]) row[key].textContent = next[key];
+        }
+        row.values = next;
+    }
+
+    // Row height depends on the stylesheet (desktop vs mobile); measure once
+    measureRowHeight() {
+        if (this.measured || !this.rows.size) return;
+        const row = this.rows.values().next().value;
+        const height = row.el.offsetHeight;
+        if (!height) return;
+        this.measured = true;
+        if (height + ROW_GAP !== this.rowHeight) {
+            this.rowHeight = height + ROW_GAP;
+            this.rows.forEach(r => { r.index = -1; });
+            this.rebuildIndex();
+            this.renderNow();
+        }
+    }
+
+    remeasure() {
+        this.measured = false;
+        this.measureRowHeight();
+    }
+
+    showMessage(text, className = 'no-teams') {
+        if (!text) {
+            if (this.message) {
+                this.message.remove();
+                this.message = null;
+            }
+            return;
+        }
+        if (!this.message) {
+            this.message = this.doc.createElement('div');
+            this.container.insertBefore(this.message, this.spacer);
+        }
+        this.message.className = className;
+        this.message.textContent = text;
+    }
+}
+
+if (typeof module !== 'undefined' && module.exports) {
+    module.exports = { TeamListView, ROW_FIELDS };
+}
@@ -39,7 +39,10 @@ window.manualScan = function() {
         showNotification('Please enter a token', 'error');
         return;
     }
-    window.location.href = `/scan?t=${encodeURIComponent(token)}`;
+    handleScannedToken(token).then(handled => {
+        // Ready for the next badge
+        if (handled) document.getElementById('manual-token').value = '';
+    });
 };
 
 // Initialize everything when the DOM is loaded
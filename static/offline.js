@@ -0,0 +1,316 @@
+// Offline-first scanning: roster cache and action queue backed by IndexedDB.
+// Gate actions are written locally first and replayed to /api/sync in batches,
+// so a scan never waits on the venue network.
+const OFFLINE_DB_NAME = 'attendance-offline';
+const SYNC_BATCH_SIZE = 50;
+const SYNC_INTERVAL_MS = 5000;
+const ROSTER_REFRESH_MS = 60000;
+const MEMBER_TOKEN_PREFIX = 'm_';
+
+let offlineDbPromise = null;
+let syncInProgress = false;
+
+function openOfflineDb() {
+    if (offlineDbPromise) return offlineDbPromise;
+
+    offlineDbPromise = new Promise((resolve, reject) => {
+        const request = indexedDB.open(OFFLINE_DB_NAME, 2);
+        request.onupgradeneeded = (event) => {
+            const db = request.result;
+            if (event.oldVersion < 1) {
+                // Pending actions in the order they were taken at the gate
+                db.createObjectStore('queue', { keyPath: 'seq', autoIncrement: true });
+                // Roster entries keyed by team token
+                db.createObjectStore('roster', { keyPath: 'token' });
+                db.createObjectStore('meta', { keyPath: 'key' });
+            }
+            if (event.oldVersion < 2) {
+                // Member badge token -> team entry, for one-scan check-in
+                request.transaction.objectStore('roster')
+                    .createIndex('member_tokens', 'member_tokens', { multiEntry: true });
+            }
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+    return offlineDbPromise;
+}
+
+function idbRequest(request) {
+    return new Promise((resolve, reject) => {
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+async function offlineStore(name, mode = 'readonly') {
+    const db = await openOfflineDb();
+    return db.transaction(name, mode).objectStore(name);
+}
+
+function transactionDone(store) {
+    return new Promise((resolve, reject) => {
+        store.transaction.oncomplete = () => resolve();
+        store.transaction.onerror = () => reject(store.transaction.error);
+    });
+}
+
+function getDeviceId() {
+    let deviceId = localStorage.getItem('attendance-device-id');
+    if (!deviceId) {
+        deviceId = Math.random().toString(36).slice(2, 10);
+        localStorage.setItem('attendance-device-id', deviceId);
+    }
+    return deviceId;
+}
+
+// Roster cache
+async function refreshRoster() {
+    let after = 0;
+    const teams = [];
+    while (after !== null) {
+        const response = await fetch(`/api/roster?after=${after}`);
+        if (!response.ok) throw new Error(`Roster fetch failed: ${response.status}`);
+        const page = await response.json();
+        teams.push(...page.teams);
+        after = page.next;
+    }
+
+    // Re-apply actions that have not reached the server yet
+    const pending = await pendingActions();
+    const store = await offlineStore('roster', 'readwrite');
+    const byToken = new Map(teams.map(team => [team.token, team]));
+    pending.forEach(item => applyToRosterTeam(byToken, item));
+    teams.forEach(team => {
+        team.member_tokens = team.members.map(m => m.token).filter(Boolean);
+    });
+    store.clear();
+    teams.forEach(team => store.put(team));
+    await transactionDone(store);
+
+    const meta = await offlineStore('meta', 'readwrite');
+    await idbRequest(meta.put({ key: 'roster-updated', at: Date.now() }));
+    return teams.length;
+}
+
+async function lookupTeam(token) {
+    const store = await offlineStore('roster');
+    return idbRequest(store.get(token));
+}
+
+async function lookupMemberBadge(token) {
+    const store = await offlineStore('roster');
+    const team = await idbRequest(store.index('member_tokens').get(token));
+    if (!team) return null;
+    return { team: team, member: team.members.find(m => m.token === token) };
+}
+
+function applyToRosterTeam(byToken, item) {
+    const team = byToken.get(item.token);
+    if (!team) return;
+    const isPresent = item.action === 'in' ? 1 : 0;
+    if (item.kind === 'team') {
+        team.is_present = isPresent;
+    } else {
+        const member = team.members.find(m => m.id === item.member_id);
+        if (member) member.is_present = isPresent;
+    }
+}
+
+async function updateRosterEntry(item) {
+    const store = await offlineStore('roster', 'readwrite');
+    const team = await idbRequest(store.get(item.token));
+    if (!team) return;
+    applyToRosterTeam(new Map([[team.token, team]]), item);
+    await idbRequest(store.put(team));
+}
+
+// Action queue
+async function pendingActions() {
+    const store = await offlineStore('queue');
+    return idbRequest(store.getAll());
+}
+
+async function queueAttendanceAction({ kind, token, memberId, action, byWho }) {
+    const item = {
+        id: `${getDeviceId()}-${Date.now()}-${Math.random().toString(36).slice(2, 8)}`,
+        kind: kind,
+        token: token,
+        member_id: memberId,
+        action: action,
+        by_who: byWho || 'scanner',
+        at: Date.now()
+    };
+
+    const store = await offlineStore('queue', 'readwrite');
+    await idbRequest(store.add(item));
+    await updateRosterEntry(item);
+
+    // Flush in the background; the caller never waits on the network
+    flushActionQueue();
+    return item;
+}
+
+async function flushActionQueue() {
+    if (syncInProgress || !navigator.onLine) return;
+    syncInProgress = true;
+
+    try {
+        while (true) {
+            const store = await offlineStore('queue');
+            const batch = await idbRequest(store.getAll(null, SYNC_BATCH_SIZE));
+            if (batch.length === 0) break;
+
+            const response = await fetch('/api/sync', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                // The server corrects action times by the skew between our clocks
+                body: JSON.stringify({ actions: batch, sent_at: Date.now() })
+            });
+            // A 4xx means the server will never accept this batch as sent; drop it
+            // rather than blocking every later action behind it
+            const rejected = response.status >= 400 && response.status < 500
+                && response.status !== 408 && response.status !== 429;
+            if (!response.ok && !rejected) throw new Error(`Sync failed: ${response.status}`);
+            if (rejected) console.log('Sync batch rejected:', response.status, batch);
+            else await response.json();
+
+            // Every status (applied, stale, duplicate, ...) is final for the server
+            const done = await offlineStore('queue', 'readwrite');
+            await Promise.all(batch.map(item => idbRequest(done.delete(item.seq))));
+        }
+    } catch (error) {
+        console.log('Sync deferred:', error.message);
+    } finally {
+        syncInProgress = false;
+        updateQueueBadge();
+    }
+}
+
+async function updateQueueBadge() {
+    const badge = document.getElementById('sync-status');
+    if (!badge) return;
+    const store = await offlineStore('queue');
+    const count = await idbRequest(store.count());
+    badge.textContent = count > 0 ? `⏳ ${count} pending sync` : '✅ Synced';
+}
+
+// Scan entry point: open the locally rendered page when the token is cached
+async function openTeamScan(token) {
+    try {
+        const team = await lookupTeam(token);
+        if (team) {
+            window.location.href = `/scan/local?t=${encodeURIComponent(token)}`;
+            return;
+        }
+    } catch (error) {
+        console.log('Roster lookup failed:', error);
+    }
+    window.location.href = `/scan?t=${encodeURIComponent(token)}`;
+}
+
+// Member badge scan: check the member in without leaving the scanner.
+// Cached badges are queued locally; unknown ones cost a single request.
+async function checkInMemberBadge(token, byWho = 'scanner') {
+    let cached = null;
+    try {
+        cached = await lookupMemberBadge(token);
+    } catch (error) {
+        console.log('Roster lookup failed:', error);
+    }
+
+    if (cached) {
+        const { team, member } = cached;
+        const alreadyIn = member.is_present === 1;
+        if (!alreadyIn) {
+            if (!team.is_present) {
+                await queueAttendanceAction({ kind: 'team', token: team.token, action: 'in', byWho });
+            }
+            await queueAttendanceAction({
+                kind: 'member', token: team.token, memberId: member.id, action: 'in', byWho
+            });
+        }
+        return { name: member.name, teamName: team.name, changed: !alreadyIn };
+    }
+
+    const response = await fetch('/api/member/checkin', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ token: token, action: 'in', by_who: byWho })
+    });
+    if (response.status === 404) return null;
+    if (!response.ok) throw new Error(`Check-in failed: ${response.status}`);
+    const result = await response.json();
+    return {
+        name: result.member.name, teamName: result.member.team_name, changed: result.changed
+    };
+}
+
+function showBadgeResult(message, type) {
+    // Under the live camera view while scanning, as a notification otherwise
+    const modal = document.getElementById('qr-scanner-modal');
+    const results = document.getElementById('qr-reader-results');
+    if (results && modal && modal.style.display === 'block') {
+        const line = document.createElement('div');
+        line.className = `badge-result badge-result-${type}`;
+        line.textContent = message;
+        results.replaceChildren(line);
+    } else if (typeof showNotification === 'function') {
+        showNotification(message, type);
+    }
+}
+
+// Entry point for every scanned or typed token. Returns true when the scan was
+// handled in place (member badge), false when the browser navigates away.
+async function handleScannedToken(token) {
+    if (token.startsWith(MEMBER_TOKEN_PREFIX)) {
+        try {
+            const result = await checkInMemberBadge(token);
+            if (result) {
+                showBadgeResult(
+                    result.changed
+                        ? `✅ ${result.name} (${result.teamName}) checked in`
+                        : `ℹ️ ${result.name} (${result.teamName}) already checked in`,
+                    result.changed ? 'success' : 'info'
+                );
+                return true;
+            }
+        } catch (error) {
+            showBadgeResult(`❌ ${error.message}`, 'error');
+            return true;
+        }
+    }
+    // Not a known badge: treat it as a team token
+    await openTeamScan(token);
+    return false;
+}
+
+async function maybeRefreshRoster() {
+    if (!navigator.onLine) return;
+    try {
+        const meta = await offlineStore('meta');
+        const updated = await idbRequest(meta.get('roster-updated'));
+        if (!updated || Date.now() - updated.at > ROSTER_REFRESH_MS) {
+            await refreshRoster();
+        }
+    } catch (error) {
+        console.log('Roster refresh deferred:', error.message);
+    }
+}
+
+if ('serviceWorker' in navigator) {
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js', { scope: '/' })
+            .catch(error => console.log('ServiceWorker registration failed:', error));
+    });
+}
+
+if ('indexedDB' in window) {
+    document.addEventListener('DOMContentLoaded', () => {
+        maybeRefreshRoster();
+        flushActionQueue();
+        setInterval(flushActionQueue, SYNC_INTERVAL_MS);
+        setInterval(maybeRefreshRoster, ROSTER_REFRESH_MS);
+    });
+    window.addEventListener('online', flushActionQueue);
+}
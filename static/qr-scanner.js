@@ -1,9 +1,14 @@
 // QR Scanner functionality
+const RESCAN_DELAY_MS = 3000;
+
 class QRScanner {
     constructor() {
         this.html5QrCode = null;
         this.currentCamera = null;
         this.scanning = false;
+        this.busy = false;
+        this.lastToken = null;
+        this.lastScanAt = 0;
     }
 
     async start() {
@@ -37,22 +42,7 @@ class QRScanner {
                     qrbox: { width: 250, height: 250 },
                     aspectRatio: 1.0
                 },
-                (decodedText) => {
-                    this.stop();
-                    // Handle both full URLs and plain tokens
-                    try {
-                        const url = new URL(decodedText);
-                        const token = url.searchParams.get('t');
-                        if (token) {
-                            window.location.href = `/scan?t=${encodeURIComponent(token)}`;
-                        } else {
-                            window.location.href = `/scan?t=${encodeURIComponent(decodedText)}`;
-                        }
-                    } catch {
-                        // If not a valid URL, treat as a raw token
-                        window.location.href = `/scan?t=${encodeURIComponent(decodedText)}`;
-                    }
-                },
+                (decodedText) => this.onScan(decodedText),
                 () => {} // Ignore errors during scanning
             );
 
@@ -65,6 +55,39 @@ class QRScanner {
         }
     }
 
+    async onScan(decodedText) {
+        // Handle both full URLs and plain tokens
+        let token = decodedText;
+        try {
+            const url = new URL(decodedText);
+            token = url.searchParams.get('t') || decodedText;
+        } catch {
+            // If not a valid URL, treat as a raw token
+        }
+
+        // The camera sees the same badge many times per second
+        const now = Date.now();
+        if (this.busy || (token === this.lastToken && now - this.lastScanAt < RESCAN_DELAY_MS)) {
+            return;
+        }
+        this.busy = true;
+        this.lastToken = token;
+        this.lastScanAt = now;
+
+        try {
+            if (!token.startsWith(MEMBER_TOKEN_PREFIX)) {
+                await this.stop();
+            }
+            // Member badges are checked in on the spot and scanning continues
+            const handled = await handleScannedToken(token);
+            if (!handled) {
+                await this.stop();
+            }
+        } finally {
+            this.busy = false;
+        }
+    }
+
     async stop() {
         if (this.html5QrCode && this.scanning) {
             try {
@@ -0,0 +1,92 @@
+// Service worker: keeps the scanner shell and static assets available offline.
+// API calls always go to the network; queued actions are replayed by offline.js.
+const CACHE_NAME = 'attendance-shell-v3';
+const SHELL_URLS = [
+    '/',
+    '/scan/local',
+    '/static/styles.css',
+    '/static/fix.js',
+    '/static/qr-scanner.js',
+    '/static/offline.js'
+];
+const EXTERNAL_URLS = ['https://unpkg.com/html5-qrcode@2.3.8'];
+
+self.addEventListener('install', event => {
+    event.waitUntil(
+        caches.open(CACHE_NAME).then(cache => Promise.all([
+            cache.addAll(SHELL_URLS),
+            // The QR library is cross-origin; cache it opaquely and ignore failures
+            ...EXTERNAL_URLS.map(url =>
+                fetch(url, { mode: 'no-cors' })
+                    .then(response => cache.put(url, response))
+                    .catch(() => {})
+            )
+        ])).then(() => self.skipWaiting())
+    );
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(
+        caches.keys()
+            .then(keys => Promise.all(
+                keys.filter(key => key !== CACHE_NAME).map(key => caches.delete(key))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+function cacheFirst(request, cacheKey) {
+    return caches.match(cacheKey || request).then(cached => {
+        const network = fetch(request).then(response => {
+            if (response.ok) {
+                const copy = response.clone();
+                caches.open(CACHE_NAME).then(cache => cache.put(cacheKey || request, copy));
+            }
+            return response;
+        }).catch(() => cached);
+        // Serve the cached copy immediately and refresh it in the background
+        return cached || network;
+    });
+}
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET') return;
+
+    const url = new URL(request.url);
+
+    if (url.origin !== self.location.origin) {
+        if (EXTERNAL_URLS.includes(request.url)) {
+            event.respondWith(caches.match(request).then(cached => cached || fetch(request)));
+        }
+        return;
+    }
+
+    // Live data is never served from cache
+    if (url.pathname.startsWith('/api/') || url.pathname.startsWith('/admin/')) return;
+
+    // The locally rendered scan page ignores its query string
+    if (url.pathname === '/scan/local') {
+        event.respondWith(cacheFirst(request, '/scan/local'));
+        return;
+    }
+
+    // Hashed asset URLs (?v=) are immutable; fall back to any cached version offline
+    if (url.pathname.startsWith('/static/')) {
+        event.respondWith(
+            cacheFirst(request).then(response =>
+                response || caches.match(request, { ignoreSearch: true })
+            )
+        );
+        return;
+    }
+
+    // Other pages: network first, cached copy or scan shell when offline
+    if (request.mode === 'navigate') {
+        event.respondWith(
+            fetch(request).catch(() =>
+                caches.match(request).then(cached => cached || caches.match('/scan/local'))
+            )
+        );
+    }
+});
@@ -0,0 +1,184 @@
+"""Roster snapshots and batched action replay for offline scanners.
+
+Scanners cache the roster in IndexedDB, queue in/out actions locally and
+replay them here in order. Every action carries the time it was taken at
+the gate, corrected for the scanner's clock skew using the time the batch
+was sent; presence follows the latest action per team or member, so a
+late-arriving batch never overwrites a newer decision.
+"""
+import time
+
+from analytics import format_time
+
+MAX_BATCH = 500
+ROSTER_PAGE = 500
+# Queued actions older than this (after skew correction) are rejected as invalid
+MAX_ACTION_AGE = 30 * 24 * 3600
+
+def init_tables(conn):
+    """Create sync bookkeeping tables and the indexes used for conflict checks"""
+    # Client action ids already applied, so retried batches are idempotent
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS sync_actions (
+            client_id TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            synced_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_team_log_team ON team_attendance_log (team_id, at)'
+    )
+    conn.execute(
+        'CREATE INDEX IF NOT EXISTS idx_member_log_member ON member_attendance_log (member_id, at)'
+    )
+
+def roster_page(conn, after=0, limit=ROSTER_PAGE):
+    """Return one shard of the roster: teams with id > after, with their members"""
+    teams = conn.execute('''
+        SELECT id, team_id, name, college, leader_name, leader_email, leader_phone,
+               token, is_present
+        FROM teams WHERE id > ? ORDER BY id LIMIT ?
+    ''', (after, limit)).fetchall()
+
+    team_list = [dict(team) for team in teams]
+    by_team_id = {team['team_id']: team for team in team_list}
+    for team in team_list:
+        team['members'] = []
+
+    if by_team_id:
+        placeholders = ','.join('?' * len(by_team_id))
+        members = conn.execute(f'''
+            SELECT id, team_id, name, token, is_present FROM members
+            WHERE team_id IN ({placeholders}) ORDER BY name
+        ''', tuple(by_team_id)).fetchall()
+        for member in members:
+            by_team_id[member['team_id']]['members'].append(dict(member))
+
+    return {
+        'teams': team_list,
+        'next': team_list[-1]['id'] if len(team_list) == limit else None
+    }
+
+def clock_offset(sent_at, now_ms):
+    """Milliseconds to add to the scanner's clock to get server time.
+
+    The scanner sends its own Date.now() with each batch; the difference to
+    the server clock corrects every queued action time in that batch.
+    """
+    try:
+        return now_ms - int(sent_at)
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+def _action_time(value, now, offset=0):
+    """Client timestamps are epoch milliseconds; never accept one from the future.
+
+    Returns None for a time too far in the past to be a real queued action.
+    """
+    try:
+        at = (int(value) + offset) // 1000
+    except (TypeError, ValueError, OverflowError):
+        return now
+    if at < now - MAX_ACTION_AGE:
+        return None
+    return min(at, now)
+
+def _is_scalar(value):
+    """Whether a client-supplied field can be bound as an SQLite parameter"""
+    return isinstance(value, (str, int, float))
+
+def _apply_team(conn, item, at):
+    team = conn.execute(
+        'SELECT team_id FROM teams WHERE token = ?', (item.get('token'),)
+    ).fetchone()
+    if not team:
+        return 'not_found'
+
+    latest = conn.execute(
+        'SELECT MAX(at) as at FROM team_attendance_log WHERE team_id = ?', (team['team_id'],)
+    ).fetchone()['at']
+
+    conn.execute(
+        'INSERT INTO team_attendance_log (team_id, action, by_who, at) VALUES (?, ?, ?, ?)',
+        (team['team_id'], item['action'], item.get('by_who') or 'scanner', at)
+    )
+
+    # Last writer wins by gate time; older actions are kept in the log only
+    if latest is not None and str(latest) > at:
+        return 'stale'
+    conn.execute(
+        'UPDATE teams SET is_present = ? WHERE team_id = ?',
+        (1 if item['action'] == 'in' else 0, team['team_id'])
+    )
+    return 'applied'
+
+def _apply_member(conn, item, at):
+    member = conn.execute(
+        'SELECT id FROM members WHERE id = ?', (item.get('member_id'),)
+    ).fetchone()
+    if not member:
+        return 'not_found'
+
+    latest = conn.execute(
+        'SELECT MAX(at) as at FROM member_attendance_log WHERE member_id = ?', (member['id'],)
+    ).fetchone()['at']
+
+    conn.execute(
+        'INSERT INTO member_attendance_log (member_id, action, by_who, at) VALUES (?, ?, ?, ?)',
+        (member['id'], item['action'], item.get('by_who') or 'scanner', at)
+    )
+
+    if latest is not None and str(latest) > at:
+        return 'stale'
+    conn.execute(
+        'UPDATE members SET is_present = ? WHERE id = ?',
+        (1 if item['action'] == 'in' else 0, member['id'])
+    )
+    return 'applied'
+
+def apply_batch(conn, actions, sent_at=None):
+    """Apply an ordered batch of queued actions in one transaction"""
+    init_tables(conn)
+    now_ms = int(time.time() * 1000)
+    now = now_ms // 1000
+    offset = clock_offset(sent_at, now_ms)
+    results = []
+
+    for item in actions:
+        if not isinstance(item, dict):
+            results.append({'id': None, 'status': 'invalid'})
+            continue
+        client_id = item.get('id')
+        if not client_id or not _is_scalar(client_id):
+            results.append({'id': None, 'status': 'invalid'})
+            continue
+        key = 'token' if item.get('kind') == 'team' else 'member_id'
+        at = _action_time(item.get('at'), now, offset)
+        if item.get('action') not in ('in', 'out') \
+                or item.get('kind') not in ('team', 'member') \
+                or not _is_scalar(item.get(key)) \
+                or not (item.get('by_who') is None or _is_scalar(item['by_who'])) \
+                or at is None:
+            results.append({'id': client_id, 'status': 'invalid'})
+            continue
+
+        seen = conn.execute(
+            'SELECT status FROM sync_actions WHERE client_id = ?', (client_id,)
+        ).fetchone()
+        if seen:
+            results.append({'id': client_id, 'status': 'duplicate'})
+            continue
+
+        at = format_time(at)
+        if item['kind'] == 'team':
+            status = _apply_team(conn, item, at)
+        else:
+            status = _apply_member(conn, item, at)
+
+        conn.execute(
+            'INSERT INTO sync_actions (client_id, status) VALUES (?, ?)', (client_id, status)
+        )
+        results.append({'id': client_id, 'status': status})
+
+    conn.commit()
+    return results